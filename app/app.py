@@ -1,131 +1,194 @@
-from flask import Flask, render_template, request, jsonify
+import math
+import os
+import time
+import numpy as np
+from flask import Flask, Response, g, render_template, request, jsonify
 from flask_cors import CORS
-import pandas as pd
-import ast
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from scipy import sparse
+from config import (
+    MOVIES_CSV_PATH, CREDITS_CSV_PATH, MODEL_DIR, MODEL_TOP_K, NEIGHBOR_BACKEND, NEIGHBOR_OPTIONS,
+    DEFAULT_TOP_N, MAX_TOP_N, BATCH_MAX_SEEDS,
+    RERANK_CANDIDATES, RERANK_WEIGHTS, RERANK_DIVERSITY, RERANK_YEAR_HALF_LIFE,
+    METADATA_DB_PATH, METADATA_REFRESH_INTERVAL, MOOD_MAP, CATALOG_CACHE_MAX_AGE,
+    PROFILE_SLOW_REQUEST_MS, PROFILE_DIR, PRELOADED,
+)
+from genre_index import GenreIndex, bayesian_rating, sample_positions
+from metadata_store import MetadataStore
+from metrics import REGISTRY, REQUEST_SECONDS, RECOMMEND_STAGE_SECONDS, timed
+from model_store import load_or_build
+from payloads import PrecomputedPayload
+from profiler import SlowRequestProfiler
+from reranker import Reranker, WEIGHT_NAMES
+from text_search import TextSearch
+from title_index import TitleIndex
 from tmdb_service import tmdb_service
+from warm_metadata import MetadataRefresher, claim_refresher
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for React frontend
 
-# Load and preprocess data (reuse your model logic)
-def load_data(movies_path, credits_path):
-    movies = pd.read_csv(movies_path)
-    credits = pd.read_csv(credits_path)
-    movies = movies.merge(credits, left_on="id", right_on="movie_id")
-    return movies
+# Load the prebuilt model artifact. It is memory-mapped, so startup is cheap;
+# run `python build_model.py` to (re)build it offline when the CSVs change.
+model = load_or_build(MOVIES_CSV_PATH, CREDITS_CSV_PATH, MODEL_DIR, MODEL_TOP_K, NEIGHBOR_BACKEND, NEIGHBOR_OPTIONS)
+catalog = model.catalog
+movie_titles = catalog.titles()
+title_index = TitleIndex(movie_titles, catalog.ids.tolist(), catalog.vote_count.tolist())
+genre_index = GenreIndex.from_catalog(catalog)
+mood_weights = bayesian_rating(catalog.vote_average, catalog.vote_count)
+text_search = TextSearch(model.vocabulary, model.idf, model.postings)
+reranker = Reranker.from_catalog(catalog, model.vectors, RERANK_YEAR_HALF_LIFE)
 
-def parse_json_column(text):
-    try:
-        data = ast.literal_eval(text)
-        return [d["name"] for d in data]
-    except:
-        return []
+# Posters/backdrops for catalog movies come from a local store keyed by TMDB id,
+# kept fresh by a background refresher (see warm_metadata.py)
+metadata_store = MetadataStore(METADATA_DB_PATH)
+refresher_lock = None
 
-def get_top_cast(text):
-    try:
-        data = ast.literal_eval(text)
-        return [d["name"] for d in data[:3]]
-    except:
-        return []
+mood_map = MOOD_MAP
 
+profiler = None
 
-def get_director(text):
-    try:
-        data = ast.literal_eval(text)
-        for d in data:
-            if d.get("job") == "Director":
-                return d["name"]
-        return ""
-    except:
-        return ""
-
-def preprocess(movies):
-    movies["genres"] = movies["genres"].apply(parse_json_column)
-    movies["keywords"] = movies["keywords"].apply(parse_json_column)
-    movies["cast"] = movies["cast"].apply(get_top_cast)
-    movies["crew"] = movies["crew"].apply(get_director)
-    movies["overview"] = movies["overview"].fillna("")
-    movies["tags"] = (
-        movies["overview"]
-        + " "
-        + movies["genres"].apply(lambda x: " ".join(x))
-        + " "
-        + movies["keywords"].apply(lambda x: " ".join(x))
-        + " "
-        + movies["cast"].apply(lambda x: " ".join(x))
-        + " "
-        + movies["crew"]
-    )
-    return movies
-
-def build_similarity(movies):
-    tfidf = TfidfVectorizer(stop_words="english", max_features=5000)
-    movie_vectors = tfidf.fit_transform(movies["tags"]).toarray()
-    similarity = cosine_similarity(movie_vectors)
-    return similarity
-
-# Load model data once
-movies_path = "C:\\Users\\Mayank Singh Tomar\\OneDrive\\Desktop\\Project1\\CineMatches\\Cinematch\\tmdb_5000_movies.csv"
-credits_path = "C:\\Users\\Mayank Singh Tomar\\OneDrive\\Desktop\\Project1\\CineMatches\\Cinematch\\tmdb_5000_credits.csv"
-movies = load_data(movies_path, credits_path)
-movies = preprocess(movies)
-similarity = build_similarity(movies)
-
-
-mood_map = {
-    "happy": ["Comedy", "Romance", "Adventure"],
-    "sad": ["Drama", "Romance"],
-    "excited": ["Action", "Thriller"],
-    "relaxed": ["Animation", "Family", "Fantasy"],
-}
-
-def recommend_by_mood(mood, movies, top_n=5):
-    genres = mood_map.get(mood.lower(), [])
-    if not genres:
+def start_background_tasks():
+    """Start this process's background threads.
+
+    Threads do not survive fork, so under a preloading server this runs in
+    each worker (see gunicorn.conf.py) rather than in the master.
+    """
+    global profiler, refresher_lock
+    if PROFILE_SLOW_REQUEST_MS > 0:
+        profiler = SlowRequestProfiler(PROFILE_SLOW_REQUEST_MS / 1000.0, PROFILE_DIR)
+    if METADATA_REFRESH_INTERVAL > 0:
+        # One refresher per host, however many workers share the store
+        refresher_lock = claim_refresher(METADATA_DB_PATH + ".refresher.lock")
+        if refresher_lock is not None:
+            MetadataRefresher(metadata_store, catalog.ids.tolist(), METADATA_REFRESH_INTERVAL).start()
+
+def init_worker():
+    """Post-fork setup for a worker that inherited the preloaded app.
+
+    The model, catalog and indexes stay shared with the master (memory-mapped
+    files and copy-on-write pages); only sockets, SQLite connections and
+    threads are recreated per worker.
+    """
+    metadata_store.reset_connections()
+    tmdb_service.after_fork()
+    start_background_tasks()
+
+if not PRELOADED:
+    start_background_tasks()
+
+def collect_service_metrics():
+    """Cache and model gauges, read at scrape time"""
+    cache = tmdb_service.get_cache_stats()
+    yield ("cinematch_tmdb_cache_lookups_total", "counter", "TMDB response cache lookups",
+           [({"result": "hit"}, cache["hits"]), ({"result": "miss"}, cache["misses"]),
+            ({"result": "stale_hit"}, cache["stale_hits"])])
+    yield ("cinematch_tmdb_cache_evictions_total", "counter", "TMDB response cache LRU evictions",
+           [({}, cache["evictions"])])
+    yield ("cinematch_tmdb_cache_hit_ratio", "gauge", "TMDB response cache hit ratio",
+           [({}, cache["hit_ratio"])])
+    limiter = tmdb_service.get_rate_limit_stats()
+    yield ("cinematch_tmdb_rate_tokens", "gauge", "Tokens left in the TMDB rate limiter",
+           [({}, limiter["tokens"])])
+    yield ("cinematch_tmdb_rate_queued", "gauge", "TMDB calls queued for a rate-limit token",
+           [({}, limiter["queued"])])
+    yield ("cinematch_tmdb_rate_pauses_total", "counter", "Rate limiter pauses requested by TMDB",
+           [({}, limiter["pauses"])])
+    yield ("cinematch_model_info", "gauge", "Loaded model artifact",
+           [({"version": model.version, "n_movies": model.manifest["n_movies"]}, 1)])
+    yield ("cinematch_model_build_stage_seconds", "gauge", "Stage timings recorded when the model was built",
+           [({"stage": stage}, seconds) for stage, seconds in model.manifest.get("stage_seconds", {}).items()])
+
+REGISTRY.register_collector(collect_service_metrics)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    if profiler:
+        profiler.start_request()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        duration = time.perf_counter() - started
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        REQUEST_SECONDS.observe(duration, route=route, method=request.method,
+                                mode=g.get("mode") or "", status=response.status_code)
+        if profiler:
+            profiler.finish_request(f"{request.method} {route}", duration)
+    return response
+
+# Static parts of the homepage data only change with the model, so serialise
+# and compress them once and let clients cache them by ETag
+catalog_payload = PrecomputedPayload(
+    {'version': model.version, 'movie_titles': movie_titles, 'moods': list(mood_map.keys())},
+    model.version,
+    CATALOG_CACHE_MAX_AGE,
+)
+
+def get_movie_metadata(movie_ids, fetch_missing=True):
+    """Display metadata for catalog movies, looked up locally by TMDB id.
+
+    Movies missing from the store are fetched from TMDB by id (never by
+    title, which can match the wrong movie) and stored for next time. With
+    fetch_missing=False they are left out and the metadata refresher fills
+    them in later.
+    """
+    metadata = metadata_store.get_many(movie_ids)
+    missing = [movie_id for movie_id in movie_ids if movie_id not in metadata]
+    if missing and fetch_missing:
+        fetched = tmdb_service.get_movie_details_many(missing)
+        metadata_store.upsert_many(fetched.values())
+        metadata.update(fetched)
+    return metadata
+
+def build_recommendations(positions):
+    """Turn catalog positions into recommendation dicts with poster/backdrop paths"""
+    return build_recommendation_lists([positions])[0]
+
+def build_recommendation_lists(position_lists, score_lists=None, fetch_missing=True):
+    """Like build_recommendations for several lists, with one metadata lookup for all of them"""
+    rows = {int(i): catalog.row(i) for positions in position_lists for i in positions}
+    metadata = get_movie_metadata([row['id'] for row in rows.values()], fetch_missing)
+    lists = []
+    for n, positions in enumerate(position_lists):
+        recommendations = []
+        for j, i in enumerate(positions):
+            row = rows[int(i)]
+            tmdb_movie = metadata.get(row['id'])
+            recommendation = {
+                'id': row['id'],
+                'title': row['title'],
+                'overview': row['overview'],
+                'poster_path': tmdb_movie.get('poster_path') if tmdb_movie else None,
+                'backdrop_path': tmdb_movie.get('backdrop_path') if tmdb_movie else None,
+                'release_date': row['release_date'],
+                'vote_average': row['vote_average'],
+                'vote_count': row['vote_count'],
+                'genres': row['genres']
+            }
+            if score_lists is not None:
+                recommendation['score'] = round(float(score_lists[n][j]), 4)
+            recommendations.append(recommendation)
+        lists.append(recommendations)
+    return lists
+
+def recommend_by_mood(mood, top_n=5, weighted=False):
+    rule = mood_map.get(mood.lower()) if mood else None
+    if not rule:
         return [], f"No mapping found for mood: {mood}"
-    filtered = movies[movies["genres"].apply(lambda g: any(x in g for x in genres))]
-    sample = filtered.sample(min(top_n, len(filtered)))
-    recommendations = []
-    for _, row in sample.iterrows():
-        movie_title = row.title_x
-        
-        # Try to find the movie on TMDB to get poster images
-        tmdb_movie = None
-        try:
-            search_results = tmdb_service.search_movies(movie_title)
-            if search_results and 'results' in search_results and search_results['results']:
-                # Find the best match (first result or exact title match)
-                for result in search_results['results']:
-                    if result['title'].lower() == movie_title.lower():
-                        tmdb_movie = result
-                        break
-                if not tmdb_movie:
-                    tmdb_movie = search_results['results'][0]  # Use first result as fallback
-        except Exception as e:
-            print(f"Error searching TMDB for {movie_title}: {e}")
-        
-        recommendations.append({
-            'id': int(row.id) if hasattr(row, 'id') else 0,
-            'title': row.title_x,
-            'overview': row.overview if hasattr(row, 'overview') else '',
-            'poster_path': tmdb_movie.get('poster_path') if tmdb_movie else None,
-            'backdrop_path': tmdb_movie.get('backdrop_path') if tmdb_movie else None,
-            'release_date': row.release_date if hasattr(row, 'release_date') else '',
-            'vote_average': float(row.vote_average) if hasattr(row, 'vote_average') else 0.0,
-            'vote_count': int(row.vote_count) if hasattr(row, 'vote_count') else 0,
-            'genres': row.genres if hasattr(row, 'genres') else []
-        })
-    return recommendations, None
+    with timed(RECOMMEND_STAGE_SECONDS, mode="mood", stage="genre_filter"):
+        positions = genre_index.match(rule)
+        sample = sample_positions(positions, top_n, mood_weights if weighted else None)
+    with timed(RECOMMEND_STAGE_SECONDS, mode="mood", stage="enrichment"):
+        return build_recommendations(sample), None
 
 
 @app.route("/")
 def index():
     # Check if request accepts JSON (from React) or HTML (direct browser access)
     if request.headers.get('Accept', '').find('application/json') != -1:
-        # Return JSON for React frontend
-        movie_titles = movies["title_x"].tolist()
+        # Return JSON for React frontend; the title list is served by /catalog
         moods = list(mood_map.keys())
         
         # Get popular movies from TMDB
@@ -144,13 +207,13 @@ def index():
                 })
         
         return jsonify({
-            'movie_titles': movie_titles,
             'moods': moods,
+            'catalog_url': '/catalog',
+            'catalog_version': catalog_payload.etag,
             'popular_movies': popular_movies_data
         })
     else:
         # Return HTML template for direct browser access
-        movie_titles = movies["title_x"].tolist()
         moods = list(mood_map.keys())
         
         # Get popular movies from TMDB
@@ -171,58 +234,75 @@ def index():
                              moods=moods,
                              popular_movies=popular_movies_data)
 
+def get_request_value(form_name, json_name=None):
+    """Read a parameter from an HTML form post or a JSON body"""
+    if request.form.get(form_name):
+        return request.form.get(form_name)
+    data = request.get_json(silent=True) or {}
+    return data.get(json_name or form_name)
+
+def get_top_n():
+    """Number of results requested by the client, clamped to [1, MAX_TOP_N]"""
+    try:
+        top_n = int(get_request_value("top_n") or DEFAULT_TOP_N)
+    except (TypeError, ValueError):
+        top_n = DEFAULT_TOP_N
+    return max(1, min(top_n, MAX_TOP_N))
+
+def get_rerank_weights():
+    """(weights, diversity) for movie-mode ranking: config defaults overridden by a JSON "weights" object"""
+    weights = dict(RERANK_WEIGHTS, diversity=RERANK_DIVERSITY)
+    overrides = get_request_value("weights") or {}
+    if not isinstance(overrides, dict):
+        raise ValueError("weights must be an object")
+    for name, value in overrides.items():
+        if name not in weights:
+            raise ValueError(f"Unknown weight: {name} (expected one of {', '.join(WEIGHT_NAMES)}, diversity)")
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or value < 0:
+            raise ValueError(f"Weight {name} must be a finite, non-negative number")
+        weights[name] = float(value)
+    if weights["diversity"] > 1:
+        raise ValueError("Weight diversity must be between 0 and 1")
+    return weights, weights.pop("diversity")
+
+@app.route("/catalog")
+def catalog_data():
+    """Local title list and moods, precompressed and ETag-validated"""
+    return catalog_payload.response(request)
+
 @app.route("/recommend", methods=["POST"])
 def recommend():
-    mode = request.form.get("mode") or request.json.get("mode") if request.json else None
-    movie_title = request.form.get("movie_title") or request.json.get("movie_name") if request.json else None
-    mood = request.form.get("mood") or request.json.get("mood") if request.json else None
+    mode = get_request_value("mode")
+    movie_title = get_request_value("movie_title", "movie_name")
+    movie_id = get_request_value("movie_id")
+    mood = get_request_value("mood")
+    top_n = get_top_n()
+    g.mode = mode
     
-    movie_titles = movies["title_x"].tolist()
     moods = list(mood_map.keys())
     
     if mode == "movie":
-        try:
-            idx = movies[movies["title_x"] == movie_title].index[0]
-        except IndexError:
+        with timed(RECOMMEND_STAGE_SECONDS, mode="movie", stage="title_lookup"):
+            idx = title_index.resolve_id(movie_id) if movie_id else title_index.resolve(movie_title)
+        if idx is None:
             error_msg = "Movie not found."
             if request.headers.get('Accept', '').find('application/json') != -1:
                 return jsonify({'error': error_msg}), 400
             return render_template("index.html", movie_titles=movie_titles, moods=moods, error=error_msg)
         
-        distances = similarity[idx]
-        movie_list = sorted(list(enumerate(distances)), key=lambda x: x[1], reverse=True)[1:6]
-        recommendations = []
+        try:
+            weights, diversity = get_rerank_weights()
+        except ValueError as e:
+            if request.headers.get('Accept', '').find('application/json') != -1:
+                return jsonify({'error': str(e)}), 400
+            return render_template("index.html", movie_titles=movie_titles, moods=moods, error=str(e))
         
-        for i in movie_list:
-            movie_row = movies.iloc[i[0]]
-            movie_title = movie_row.title_x
-            
-            # Try to find the movie on TMDB to get poster images
-            tmdb_movie = None
-            try:
-                search_results = tmdb_service.search_movies(movie_title)
-                if search_results and 'results' in search_results and search_results['results']:
-                    # Find the best match (first result or exact title match)
-                    for result in search_results['results']:
-                        if result['title'].lower() == movie_title.lower():
-                            tmdb_movie = result
-                            break
-                    if not tmdb_movie:
-                        tmdb_movie = search_results['results'][0]  # Use first result as fallback
-            except Exception as e:
-                print(f"Error searching TMDB for {movie_title}: {e}")
-            
-            recommendations.append({
-                'id': int(movie_row.id) if hasattr(movie_row, 'id') else 0,
-                'title': movie_row.title_x,
-                'overview': movie_row.overview if hasattr(movie_row, 'overview') else '',
-                'poster_path': tmdb_movie.get('poster_path') if tmdb_movie else None,
-                'backdrop_path': tmdb_movie.get('backdrop_path') if tmdb_movie else None,
-                'release_date': movie_row.release_date if hasattr(movie_row, 'release_date') else '',
-                'vote_average': float(movie_row.vote_average) if hasattr(movie_row, 'vote_average') else 0.0,
-                'vote_count': int(movie_row.vote_count) if hasattr(movie_row, 'vote_count') else 0,
-                'genres': movie_row.genres if hasattr(movie_row, 'genres') else []
-            })
+        with timed(RECOMMEND_STAGE_SECONDS, mode="movie", stage="similarity"):
+            candidates, similarity = model.neighbors.query(idx, max(RERANK_CANDIDATES, top_n))
+        with timed(RECOMMEND_STAGE_SECONDS, mode="movie", stage="rerank"):
+            movie_list, _ = reranker.rerank(idx, candidates, similarity, top_n, weights, diversity)
+        with timed(RECOMMEND_STAGE_SECONDS, mode="movie", stage="enrichment"):
+            recommendations = build_recommendations(movie_list)
         
         if request.headers.get('Accept', '').find('application/json') != -1:
             return jsonify({'results': recommendations})
@@ -231,7 +311,8 @@ def recommend():
         return render_template("index.html", movie_titles=movie_titles, moods=moods, recommendations=rec_titles, selected=movie_title, selected_mode="movie")
         
     elif mode == "mood":
-        recommendations, error = recommend_by_mood(mood, movies)
+        weighted = str(get_request_value("weighted") or "").lower() in ("1", "true", "yes")
+        recommendations, error = recommend_by_mood(mood, top_n, weighted)
         
         if request.headers.get('Accept', '').find('application/json') != -1:
             if error:
@@ -246,6 +327,160 @@ def recommend():
             return jsonify({'error': error_msg}), 400
         return render_template("index.html", movie_titles=movie_titles, moods=moods, error=error_msg)
 
+def parse_year(value):
+    if value in (None, ""):
+        return None
+    return int(value)
+
+def build_filter_mask(genres, year_from, year_to):
+    """Boolean catalog mask for optional genre (any of) and release year filters, or None"""
+    mask = None
+    if genres:
+        if isinstance(genres, str):
+            genres = [g.strip() for g in genres.split(",") if g.strip()]
+        mask = genre_index.mask({"any": genres})
+    if year_from is not None or year_to is not None:
+        year = np.asarray(catalog.year)
+        in_range = year > 0
+        if year_from is not None:
+            in_range &= year >= year_from
+        if year_to is not None:
+            in_range &= year <= year_to
+        mask = in_range if mask is None else mask & in_range
+    return mask
+
+@app.route("/recommend/text", methods=["POST"])
+def recommend_text():
+    """Recommendations for a free-text description, optionally filtered by genre and year"""
+    g.mode = "text"
+    text = get_request_value("text")
+    if not isinstance(text, str) or not text.strip():
+        return jsonify({'error': 'Please describe what you want to watch.'}), 400
+    text = text.strip()
+    genres = get_request_value("genres")
+    if genres and not (isinstance(genres, str)
+                       or (isinstance(genres, list) and all(isinstance(g, str) for g in genres))):
+        return jsonify({'error': 'genres must be a genre name or a list of genre names.'}), 400
+    try:
+        year_from = parse_year(get_request_value("year_from"))
+        year_to = parse_year(get_request_value("year_to"))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'year_from and year_to must be years, e.g. 1990.'}), 400
+    top_n = get_top_n()
+
+    with timed(RECOMMEND_STAGE_SECONDS, mode="text", stage="similarity"):
+        mask = build_filter_mask(genres, year_from, year_to)
+        positions, scores, terms = text_search.search(text, top_n, mask)
+    with timed(RECOMMEND_STAGE_SECONDS, mode="text", stage="enrichment"):
+        recommendations = build_recommendation_lists([positions], [scores])[0]
+    return jsonify({'terms': terms, 'results': recommendations})
+
+def resolve_seed(seed):
+    """(catalog position or None, weight) for a batch seed: a TMDB id, a title,
+    or {"movie_id" | "title", "weight"}. Ids may be numbers or digit strings, like
+    /recommend's movie_id; a digit string that is not a catalog id is tried as a title.
+    Raises ValueError for a weight that is not a finite number."""
+    weight = 1.0
+    movie_id = title = None
+    if isinstance(seed, dict):
+        weight = seed.get("weight", 1.0)
+        if isinstance(weight, bool) or not isinstance(weight, (int, float)) or not math.isfinite(weight):
+            raise ValueError(f"Invalid seed weight: {weight!r}")
+        weight = float(weight)
+        movie_id, title = seed.get("movie_id"), seed.get("title")
+    elif isinstance(seed, int):
+        movie_id = seed
+    elif isinstance(seed, str):
+        movie_id = seed if seed.strip().isdigit() else None
+        title = seed
+    position = None
+    if movie_id is not None and not isinstance(movie_id, bool):
+        position = title_index.resolve_id(movie_id)
+    if position is None and isinstance(title, str) and title.strip():
+        position = title_index.resolve(title)
+    return position, weight
+
+@app.route("/recommend/batch", methods=["POST"])
+def recommend_batch():
+    """Recommendations for many seeds, or weighted watch histories, in one call.
+
+    JSON body: {"seeds": [id or title, ...]} returns a list per seed;
+    {"histories": {"<name>": [id, title or {"movie_id"|"title", "weight"}, ...]}}
+    returns one list per history, scored against the weighted seed set with
+    the seeds themselves excluded. Both may be combined; `top_n` applies to
+    every list.
+    """
+    g.mode = "batch"
+    data = request.get_json(silent=True) or {}
+    seeds = data.get("seeds") or []
+    histories = data.get("histories") or {}
+    if not isinstance(seeds, list) or not isinstance(histories, dict):
+        return jsonify({'error': '"seeds" must be a list and "histories" an object.'}), 400
+    if not all(isinstance(items, list) for items in histories.values()):
+        return jsonify({'error': 'Each history must be a list of seeds.'}), 400
+    if not seeds and not histories:
+        return jsonify({'error': 'Provide "seeds" and/or "histories".'}), 400
+    if len(seeds) + sum(len(h) for h in histories.values()) > BATCH_MAX_SEEDS:
+        return jsonify({'error': f'At most {BATCH_MAX_SEEDS} seeds per request.'}), 400
+    top_n = get_top_n()
+
+    try:
+        with timed(RECOMMEND_STAGE_SECONDS, mode="batch", stage="title_lookup"):
+            seed_positions = [resolve_seed(seed)[0] for seed in seeds]
+            history_seeds = {
+                name: [resolve_seed(item) for item in items]
+                for name, items in histories.items()
+            }
+    except ValueError:
+        return jsonify({'error': 'Seed weights must be finite numbers.'}), 400
+
+    with timed(RECOMMEND_STAGE_SECONDS, mode="batch", stage="similarity"):
+        found = [pos for pos in seed_positions if pos is not None]
+        seed_results = model.neighbors.query_many(found, top_n) if found else None
+        names = list(history_seeds)
+        rows, cols, values = [], [], []
+        for row, name in enumerate(names):
+            for pos, weight in history_seeds[name]:
+                if pos is not None and weight > 0:
+                    rows.append(row)
+                    cols.append(pos)
+                    values.append(weight)
+        history_results = None
+        if names:
+            weights = sparse.csr_matrix((values, (rows, cols)), shape=(len(names), len(catalog)))
+            weights.sum_duplicates()
+            history_results = model.neighbors.query_profiles(weights, top_n)
+
+    with timed(RECOMMEND_STAGE_SECONDS, mode="batch", stage="enrichment"):
+        position_lists, score_lists = [], []
+        if seed_results is not None:
+            position_lists.extend(seed_results[0])
+            score_lists.extend(seed_results[1])
+        if history_results is not None:
+            has_seeds = np.diff(weights.indptr) > 0
+            for row in range(len(names)):
+                # A history with no recognised seeds gets no recommendations
+                position_lists.append(history_results[0][row] if has_seeds[row] else [])
+                score_lists.append(history_results[1][row] if has_seeds[row] else [])
+        # Local store only: a batch can name hundreds of uncached movies, and
+        # fetching them live would spend the interactive TMDB quota.
+        lists = iter(build_recommendation_lists(position_lists, score_lists, fetch_missing=False))
+
+    response = {}
+    if seeds:
+        response['seeds'] = []
+        for seed, pos in zip(seeds, seed_positions):
+            if pos is None:
+                response['seeds'].append({'seed': seed, 'error': 'Movie not found.'})
+            else:
+                response['seeds'].append({'seed': seed, 'movie_id': int(catalog.ids[pos]), 'results': next(lists)})
+    if histories:
+        response['histories'] = {}
+        for name in names:
+            unresolved = [item for item, (pos, _) in zip(histories[name], history_seeds[name]) if pos is None]
+            response['histories'][name] = {'results': next(lists), 'unresolved': unresolved}
+    return jsonify(response)
+
 @app.route("/search")
 def search():
     query = request.args.get('q', '')
@@ -269,6 +504,23 @@ def search():
     
     return jsonify({'results': movies_data})
 
+@app.route("/autocomplete")
+def autocomplete():
+    """Title suggestions from the local catalog; never calls TMDB"""
+    query = request.args.get('q', '')
+    try:
+        limit = max(1, min(int(request.args.get('limit', 10)), 50))
+    except ValueError:
+        limit = 10
+    suggestions = []
+    for pos in title_index.suggest(query, limit):
+        suggestions.append({
+            'id': int(catalog.ids[pos]),
+            'title': movie_titles[pos],
+            'release_date': catalog.strings["release_date"][pos]
+        })
+    return jsonify({'results': suggestions})
+
 @app.route("/movie/<int:movie_id>")
 def movie_details(movie_id):
     movie = tmdb_service.get_movie_details(movie_id)
@@ -302,10 +554,12 @@ def movie_details(movie_id):
 
 @app.route("/trending")
 def trending():
-    movie_day = tmdb_service.get_trending_movies('day')
-    movie_week = tmdb_service.get_trending_movies('week')
-    tv_day = tmdb_service.get_trending_tv('day')
-    tv_week = tmdb_service.get_trending_tv('week')
+    movie_day, movie_week, tv_day, tv_week = tmdb_service.fetch_many([
+        "trending/movie/day",
+        "trending/movie/week",
+        "trending/tv/day",
+        "trending/tv/week",
+    ])
     
     trending_data = {
         'movies_day': [],
@@ -392,5 +646,26 @@ def popular():
     
     # Return HTML template for direct browser access
     return render_template("popular.html", movies=movies_data)
+
+@app.route("/metrics")
+def metrics():
+    """Prometheus text exposition of request, TMDB, cache and model metrics"""
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/healthz")
+def healthz():
+    """Liveness check reporting which model this worker process is serving"""
+    return jsonify({
+        'status': 'ok',
+        'pid': os.getpid(),
+        'model_version': model.version,
+        'n_movies': len(catalog),
+        'preloaded': PRELOADED,
+    })
+
+@app.route("/cache/stats")
+def cache_stats():
+    return jsonify(tmdb_service.get_cache_stats())
+
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,35 @@
+"""Build the recommendation model artifact offline.
+
+Usage:
+    python build_model.py [--movies PATH] [--credits PATH] [--model-dir DIR] [--top-k N]
+                          [--backend exact|inverted] [--force]
+
+The artifact is only rebuilt when the input CSVs change (or with --force).
+The server memory-maps the artifact named in <model-dir>/CURRENT at startup.
+"""
+import argparse
+from config import MOVIES_CSV_PATH, CREDITS_CSV_PATH, MODEL_DIR, MODEL_TOP_K, NEIGHBOR_BACKEND, NEIGHBOR_OPTIONS
+from model_store import NEIGHBOR_BACKENDS, build_artifact
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Cinematch model artifact")
+    parser.add_argument("--movies", default=MOVIES_CSV_PATH, help="path to tmdb_5000_movies.csv")
+    parser.add_argument("--credits", default=CREDITS_CSV_PATH, help="path to tmdb_5000_credits.csv")
+    parser.add_argument("--model-dir", default=MODEL_DIR, help="directory for model artifacts")
+    parser.add_argument("--top-k", type=int, default=MODEL_TOP_K, help="neighbours stored per movie")
+    parser.add_argument("--backend", default=NEIGHBOR_BACKEND, choices=NEIGHBOR_BACKENDS,
+                        help="neighbour search backend (exact top-K table or approximate inverted index)")
+    parser.add_argument("--force", action="store_true", help="rebuild even if the inputs are unchanged")
+    args = parser.parse_args()
+
+    artifact = build_artifact(args.movies, args.credits, args.model_dir, args.top_k, force=args.force,
+                              backend=args.backend, neighbor_options=NEIGHBOR_OPTIONS)
+    print(f"Current model: {artifact.version} ({artifact.manifest['n_movies']} movies, "
+          f"{artifact.manifest['neighbor_backend']} neighbours)")
+    for stage, seconds in artifact.manifest.get("stage_seconds", {}).items():
+        print(f"  {stage:16s} {seconds:8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
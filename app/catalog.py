@@ -0,0 +1,129 @@
+import json
+import os
+import numpy as np
+
+
+class StringColumn:
+    """Strings stored back to back in one UTF-8 buffer with an offsets array"""
+
+    def __init__(self, buffer, offsets):
+        self.buffer = buffer
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings):
+        encoded = [str(s).encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        buffer = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(buffer, offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.buffer[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+    def tolist(self):
+        data = self.buffer.tobytes()
+        offsets = self.offsets.tolist()
+        return [data[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+
+
+class Catalog:
+    """Compact, column-oriented movie catalog.
+
+    Numeric fields are typed arrays, genres are interned to small integer
+    ids (CSR layout: `genre_indptr` / `genre_ids`), and text fields live in
+    contiguous UTF-8 buffers. Every array can be memory-mapped from the
+    model artifact, and row accessors build plain dicts without creating a
+    pandas object per row.
+    """
+
+    STRING_FIELDS = ("title", "overview", "release_date")
+    ARRAY_FIELDS = ("ids", "vote_average", "vote_count", "year", "genre_indptr", "genre_ids")
+
+    def __init__(self, ids, vote_average, vote_count, year, genre_names, genre_indptr, genre_ids, strings):
+        self.ids = ids
+        self.vote_average = vote_average
+        self.vote_count = vote_count
+        self.year = year  # release year, 0 when unknown
+        self.genre_names = list(genre_names)
+        self.genre_indptr = genre_indptr
+        self.genre_ids = genre_ids
+        self.strings = strings
+
+    @classmethod
+    def from_movies(cls, movies):
+        """Build from the preprocessed DataFrame produced by the pipeline"""
+        genre_names = sorted({g for genres in movies["genres"] for g in genres})
+        lookup = {name: i for i, name in enumerate(genre_names)}
+        genre_lists = [[lookup[g] for g in genres] for genres in movies["genres"]]
+        genre_indptr = np.zeros(len(genre_lists) + 1, dtype=np.int32)
+        np.cumsum([len(g) for g in genre_lists], out=genre_indptr[1:])
+        genre_ids = np.fromiter((g for genres in genre_lists for g in genres), dtype=np.uint16, count=int(genre_indptr[-1]))
+        year = movies["release_date"].fillna("").astype(str).str.slice(0, 4)
+        year = year.where(year.str.isdigit(), "0").astype(int)
+        strings = {
+            "title": StringColumn.from_strings(movies["title_x"].fillna("")),
+            "overview": StringColumn.from_strings(movies["overview"].fillna("")),
+            "release_date": StringColumn.from_strings(movies["release_date"].fillna("")),
+        }
+        return cls(
+            movies["id"].to_numpy(dtype=np.int64),
+            movies["vote_average"].fillna(0).to_numpy(dtype=np.float64),
+            movies["vote_count"].fillna(0).to_numpy(dtype=np.int32),
+            year.to_numpy(dtype=np.int16),
+            genre_names, genre_indptr, genre_ids, strings,
+        )
+
+    def save(self, path, prefix="catalog_"):
+        for field in self.ARRAY_FIELDS:
+            np.save(os.path.join(path, f"{prefix}{field}.npy"), getattr(self, field))
+        for field, column in self.strings.items():
+            np.save(os.path.join(path, f"{prefix}{field}_buffer.npy"), column.buffer)
+            np.save(os.path.join(path, f"{prefix}{field}_offsets.npy"), column.offsets)
+        with open(os.path.join(path, f"{prefix}genre_names.json"), "w", encoding="utf-8") as f:
+            json.dump(self.genre_names, f)
+
+    @classmethod
+    def load(cls, path, prefix="catalog_", mmap_mode="r"):
+        def array(name):
+            return np.load(os.path.join(path, f"{prefix}{name}.npy"), mmap_mode=mmap_mode)
+
+        with open(os.path.join(path, f"{prefix}genre_names.json"), encoding="utf-8") as f:
+            genre_names = json.load(f)
+        strings = {
+            field: StringColumn(array(f"{field}_buffer"), array(f"{field}_offsets"))
+            for field in cls.STRING_FIELDS
+        }
+        return cls(
+            array("ids"), array("vote_average"), array("vote_count"), array("year"),
+            genre_names, array("genre_indptr"), array("genre_ids"), strings,
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def title(self, i):
+        return self.strings["title"][i]
+
+    def titles(self):
+        return self.strings["title"].tolist()
+
+    def genres(self, i):
+        ids = self.genre_ids[self.genre_indptr[i]:self.genre_indptr[i + 1]]
+        return [self.genre_names[g] for g in ids]
+
+    def row(self, i):
+        """One movie as a plain dict"""
+        i = int(i)
+        return {
+            "id": int(self.ids[i]),
+            "title": self.strings["title"][i],
+            "overview": self.strings["overview"][i],
+            "release_date": self.strings["release_date"][i],
+            "vote_average": float(self.vote_average[i]),
+            "vote_count": int(self.vote_count[i]),
+            "genres": self.genres(i),
+        }
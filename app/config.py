@@ -1,10 +1,130 @@
+import json
+import os
+
 # TMDB API Configuration
 # Get your free API key from: https://www.themoviedb.org/settings/api
 
-TMDB_API_KEY = "82a8b253d2cb90477d007cd011e3719f"  # Replace with your actual API key
-TMDB_BASE_URL = "https://api.themoviedb.org/3"
+TMDB_API_KEY = os.environ.get("CINEMATCH_TMDB_API_KEY", "82a8b253d2cb90477d007cd011e3719f")  # Replace with your actual API key
+TMDB_BASE_URL = os.environ.get("CINEMATCH_TMDB_BASE_URL", "https://api.themoviedb.org/3")  # the benchmark points this at a local fake
 TMDB_IMAGE_BASE_URL = "https://image.tmdb.org/t/p"
 
 # Image sizes available from TMDB
 POSTER_SIZES = ["w92", "w154", "w185", "w342", "w500", "w780", "original"]
 BACKDROP_SIZES = ["w300", "w780", "w1280", "original"]
+
+# Dataset locations (override with environment variables)
+MOVIES_CSV_PATH = os.environ.get(
+    "CINEMATCH_MOVIES_CSV",
+    "C:\\Users\\Mayank Singh Tomar\\OneDrive\\Desktop\\Project1\\CineMatches\\Cinematch\\tmdb_5000_movies.csv",
+)
+CREDITS_CSV_PATH = os.environ.get(
+    "CINEMATCH_CREDITS_CSV",
+    "C:\\Users\\Mayank Singh Tomar\\OneDrive\\Desktop\\Project1\\CineMatches\\Cinematch\\tmdb_5000_credits.csv",
+)
+
+# Where `python build_model.py` writes the versioned model artifacts
+MODEL_DIR = os.environ.get(
+    "CINEMATCH_MODEL_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "model"),
+)
+
+# Number of precomputed neighbours stored per movie
+MODEL_TOP_K = int(os.environ.get("CINEMATCH_MODEL_TOP_K", "50"))
+
+# Neighbour search backend. "exact" precomputes a top-K table with a blocked
+# all-pairs scan: quadratic build time, fine up to roughly 100k titles.
+# "inverted" builds a term -> movies index in linear time and answers each
+# query approximately from the movies sharing the seed's strongest terms.
+# For "inverted", more terms or candidates raise recall and latency.
+NEIGHBOR_BACKEND = os.environ.get("CINEMATCH_NEIGHBOR_BACKEND", "exact")
+NEIGHBOR_OPTIONS = {
+    "terms": int(os.environ.get("CINEMATCH_NEIGHBOR_TERMS", "16")),  # seed terms looked up
+    "candidates": int(os.environ.get("CINEMATCH_NEIGHBOR_CANDIDATES", "200")),  # re-ranked exactly
+}
+
+# Moods map to genre rules: a list means "any of these genres"; a dict may
+# combine "any", "all" and "none" lists. CINEMATCH_MOODS_FILE may point to a
+# JSON file with the same structure to replace these defaults.
+MOOD_MAP = {
+    "happy": ["Comedy", "Romance", "Adventure"],
+    "sad": ["Drama", "Romance"],
+    "excited": ["Action", "Thriller"],
+    "relaxed": ["Animation", "Family", "Fantasy"],
+}
+if os.environ.get("CINEMATCH_MOODS_FILE"):
+    with open(os.environ["CINEMATCH_MOODS_FILE"], encoding="utf-8") as f:
+        MOOD_MAP = json.load(f)
+
+# Recommendation defaults; clients may request up to MAX_TOP_N results
+DEFAULT_TOP_N = 5
+MAX_TOP_N = 100
+BATCH_MAX_SEEDS = 1000  # seeds (plus history entries) accepted by one /recommend/batch call
+
+# Movie-mode re-ranking: the seed's RERANK_CANDIDATES nearest neighbours are
+# re-scored as a blend of similarity, genre overlap, Bayesian rating and
+# release-year recency, then diversified with MMR (RERANK_DIVERSITY, 0
+# disables). Requests may override any of these through "weights". Keep
+# RERANK_CANDIDATES within MODEL_TOP_K so candidates come from the
+# precomputed neighbour table.
+RERANK_CANDIDATES = 50
+RERANK_WEIGHTS = {"similarity": 1.0, "genre": 0.1, "quality": 0.3, "recency": 0.0}
+RERANK_DIVERSITY = 0.3
+RERANK_YEAR_HALF_LIFE = 10  # years for the recency feature to halve
+
+# Local TMDB metadata store (posters/backdrops keyed by TMDB id)
+METADATA_DB_PATH = os.environ.get("CINEMATCH_METADATA_DB", os.path.join(MODEL_DIR, "metadata.sqlite3"))
+METADATA_MAX_AGE = 7 * 24 * 3600  # refresh entries older than a week
+METADATA_REFRESH_INTERVAL = int(os.environ.get("CINEMATCH_METADATA_REFRESH_INTERVAL", str(6 * 3600)))  # 0 disables
+METADATA_REFRESH_BATCH = 200  # movies refreshed per scheduled run
+
+# TMDB response cache. TTLs (seconds) are matched by endpoint prefix, first match wins.
+TMDB_CACHE_TTLS = [
+    ("trending/", 10 * 60),
+    ("movie/popular", 10 * 60),
+    ("search/", 6 * 3600),
+    ("movie/", 3 * 24 * 3600),
+]
+TMDB_CACHE_MAX_ENTRIES = 2048
+TMDB_CACHE_DISK_PATH = os.environ.get("CINEMATCH_TMDB_CACHE_DB")  # e.g. model/tmdb_cache.sqlite3; unset disables
+
+# TMDB HTTP connection pool and concurrent batch fetches
+TMDB_POOL_SIZE = 20  # keep-alive connections kept open to TMDB
+TMDB_MAX_WORKERS = 8  # concurrent requests per fetch_many batch
+TMDB_BATCH_DEADLINE = 10  # seconds a fetch_many batch may take in total
+# Expired responses are kept this long and served immediately while a
+# background refresh runs (stale-while-revalidate)
+TMDB_CACHE_STALE_TTL = 24 * 3600
+
+# Client-side TMDB rate limit (token bucket; 0 disables). The rate is one
+# quota for the whole host: server workers and the warm_metadata command
+# share the bucket through TMDB_RATE_STATE_PATH. Interactive calls are
+# served before background ones (warmers, refreshes), and background calls
+# leave TMDB_RATE_RESERVE tokens for user bursts. A call still queued after
+# its max wait gives up. A 429 pauses the bucket for its Retry-After.
+TMDB_RATE_LIMIT = float(os.environ.get("CINEMATCH_TMDB_RATE", "40"))  # requests per second, per host
+TMDB_RATE_BURST = 20
+TMDB_RATE_RESERVE = 5
+TMDB_INTERACTIVE_MAX_WAIT = 3  # seconds
+TMDB_BACKGROUND_MAX_WAIT = 120  # seconds
+# Shared bucket state; set CINEMATCH_TMDB_RATE_STATE to "" to limit each
+# process on its own. Then a server worker gets 1/SERVER_WORKERS of the rate
+# and the warm_metadata command TMDB_WARMER_RATE_SHARE of it.
+TMDB_RATE_STATE_PATH = os.environ.get("CINEMATCH_TMDB_RATE_STATE", os.path.join(MODEL_DIR, "tmdb_rate.sqlite3"))
+TMDB_WARMER_RATE_SHARE = 0.25
+SERVER_WORKERS = int(os.environ.get("CINEMATCH_WORKERS", "4"))  # gunicorn workers, see gunicorn.conf.py
+
+# Browser cache lifetime of the /catalog payload; clients revalidate with its ETag
+CATALOG_CACHE_MAX_AGE = 3600
+
+# Opt-in sampling profiler: requests slower than this many milliseconds get
+# their sampled stacks written to PROFILE_DIR (0 disables the profiler)
+PROFILE_SLOW_REQUEST_MS = int(os.environ.get("CINEMATCH_PROFILE_SLOW_MS", "0"))
+PROFILE_DIR = os.environ.get(
+    "CINEMATCH_PROFILE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profiles"),
+)
+
+# Set by wsgi.py when a pre-forking server (gunicorn --preload) loads the app
+# once in its master process; background threads then start in each worker
+# from the server's post-fork hook instead of at import time
+PRELOADED = os.environ.get("CINEMATCH_PRELOAD", "0") == "1"
@@ -0,0 +1,100 @@
+"""Export every movie's top-K neighbours to a Parquet file.
+
+Usage:
+    python export_neighbors.py --output neighbors.parquet [--top-k 50]
+                               [--workers N] [--chunk-size 2048] [--model-dir DIR]
+
+Reads the current model artifact and writes one row per (movie, rank) with
+columns movie_id, rank, neighbor_id and score, for offline jobs (email and
+homepage personalisation) that would otherwise call /recommend per title.
+
+Chunks of movies are scored in parallel worker processes. Each worker
+memory-maps the same artifact, so there is one copy of the model in memory.
+Chunks are written in order as Parquet row groups, and at most two chunks
+per worker are in flight at once, so memory stays bounded for any catalog
+size. Neighbours come from the exact top-K table when the artifact has one
+that is wide enough, otherwise from exact batch scoring.
+"""
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from config import MODEL_DIR, MODEL_TOP_K
+from model_store import ModelArtifact, read_current_manifest
+
+_model = None
+
+
+def _open(model_dir, manifest):
+    # One artifact per worker process, memory-mapped and reused across chunks
+    global _model
+    if _model is None or _model.version != manifest["version"]:
+        _model = ModelArtifact.open(model_dir, manifest)
+    return _model
+
+
+def export_chunk(model_dir, manifest, start, stop, k):
+    """(movie_id, rank, neighbor_id, score) columns for catalog rows [start, stop)"""
+    model = _open(model_dir, manifest)
+    indices, scores = model.neighbors.query_many(np.arange(start, stop), k)
+    ids = np.asarray(model.catalog.ids)
+    width = indices.shape[1]
+    return {
+        "movie_id": np.repeat(ids[start:stop], width),
+        "rank": np.tile(np.arange(1, width + 1, dtype=np.int16), stop - start),
+        "neighbor_id": ids[indices.ravel()],
+        "score": scores.ravel().astype(np.float32),
+    }
+
+
+def export_neighbors(model_dir, output, k, workers=None, chunk_size=2048):
+    """Write the neighbour export and return the number of rows written"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    manifest = read_current_manifest(model_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"No model artifact found in {model_dir}; run build_model.py first")
+    n = manifest["n_movies"]
+    k = max(1, min(k, n - 1))
+    workers = workers or os.cpu_count() or 1
+    tmp_path = f"{output}.tmp-{os.getpid()}"
+    rows = 0
+    chunks = iter(range(0, n, chunk_size))
+    with ProcessPoolExecutor(max_workers=workers) as pool, pq.ParquetWriter(tmp_path, pa.schema([
+        ("movie_id", pa.int64()), ("rank", pa.int16()), ("neighbor_id", pa.int64()), ("score", pa.float32()),
+    ])) as writer:
+        pending = deque()
+        while True:
+            while len(pending) < 2 * workers:
+                start = next(chunks, None)
+                if start is None:
+                    break
+                pending.append(pool.submit(export_chunk, model_dir, manifest, start, min(start + chunk_size, n), k))
+            if not pending:
+                break
+            columns = pending.popleft().result()
+            writer.write_table(pa.table(columns))
+            rows += len(columns["movie_id"])
+    os.replace(tmp_path, output)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export every movie's top-K neighbours to Parquet")
+    parser.add_argument("--output", required=True, help="Parquet file to write")
+    parser.add_argument("--model-dir", default=MODEL_DIR, help="directory holding the model artifact")
+    parser.add_argument("--top-k", type=int, default=MODEL_TOP_K, help="neighbours per movie")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=2048, help="movies scored per chunk")
+    args = parser.parse_args()
+
+    started = time.time()
+    rows = export_neighbors(args.model_dir, args.output, args.top_k, args.workers, args.chunk_size)
+    print(f"Wrote {rows} neighbour rows to {args.output} in {time.time() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
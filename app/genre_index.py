@@ -0,0 +1,92 @@
+import numpy as np
+
+
+def bayesian_rating(vote_average, vote_count, min_votes=None):
+    """IMDb-style weighted rating that pulls low-vote titles towards the mean.
+
+    `min_votes` defaults to the 60th percentile of vote counts.
+    """
+    vote_average = np.asarray(vote_average, dtype=np.float64)
+    vote_count = np.asarray(vote_count, dtype=np.float64)
+    if min_votes is None:
+        min_votes = np.percentile(vote_count, 60) if len(vote_count) else 0.0
+    mean = vote_average.mean() if len(vote_average) else 0.0
+    total = vote_count + min_votes
+    total[total == 0] = 1.0
+    return (vote_count * vote_average + min_votes * mean) / total
+
+
+def parse_mood_rule(rule):
+    """Normalise a mood rule to {"any": [...], "all": [...], "none": [...]}.
+
+    A plain list of genres means "any of these" (the original format).
+    """
+    if isinstance(rule, (list, tuple)):
+        rule = {"any": list(rule)}
+    return {key: list(rule.get(key, [])) for key in ("any", "all", "none")}
+
+
+class GenreIndex:
+    """Per-genre bitsets (boolean masks) over the catalog.
+
+    A mood resolves through vectorised OR/AND of the masks instead of a
+    Python pass over every movie.
+    """
+
+    def __init__(self, genres_per_movie):
+        self.size = len(genres_per_movie)
+        self.masks = {}
+        for pos, genres in enumerate(genres_per_movie):
+            for genre in genres:
+                mask = self.masks.get(genre)
+                if mask is None:
+                    mask = self.masks[genre] = np.zeros(self.size, dtype=bool)
+                mask[pos] = True
+
+    @classmethod
+    def from_catalog(cls, catalog):
+        """Build the masks straight from the catalog's interned genre ids"""
+        index = cls([])
+        index.size = len(catalog)
+        rows = np.repeat(np.arange(index.size), np.diff(catalog.genre_indptr))
+        genre_ids = np.asarray(catalog.genre_ids)
+        for genre_id, name in enumerate(catalog.genre_names):
+            mask = np.zeros(index.size, dtype=bool)
+            mask[rows[genre_ids == genre_id]] = True
+            index.masks[name] = mask
+        return index
+
+    def _mask(self, genre):
+        mask = self.masks.get(genre)
+        return mask if mask is not None else np.zeros(self.size, dtype=bool)
+
+    def match(self, rule):
+        """Catalog positions matching a mood rule (see parse_mood_rule)"""
+        return np.flatnonzero(self.mask(rule))
+
+    def mask(self, rule):
+        """Boolean mask over the catalog of the movies matching a rule"""
+        rule = parse_mood_rule(rule)
+        if rule["any"]:
+            selected = np.logical_or.reduce([self._mask(g) for g in rule["any"]])
+        else:
+            selected = np.ones(self.size, dtype=bool)
+        for genre in rule["all"]:
+            selected &= self._mask(genre)
+        for genre in rule["none"]:
+            selected &= ~self._mask(genre)
+        return selected
+
+
+def sample_positions(positions, n, weights=None, rng=None):
+    """Sample up to n distinct positions, optionally weighted"""
+    rng = rng or np.random.default_rng()
+    n = min(n, len(positions))
+    if n == 0:
+        return positions[:0]
+    p = None
+    if weights is not None:
+        w = np.asarray(weights, dtype=np.float64)[positions]
+        w = np.clip(w, 0, None) + 1e-9  # every candidate keeps a non-zero chance
+        p = w / w.sum()
+    return rng.choice(positions, size=n, replace=False, p=p)
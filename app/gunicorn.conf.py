@@ -0,0 +1,19 @@
+"""Gunicorn settings for the shared-model serving mode (see wsgi.py).
+
+Run from the app directory:
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+import os
+
+bind = os.environ.get("CINEMATCH_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("CINEMATCH_WORKERS", "4"))
+worker_class = "gthread"
+threads = int(os.environ.get("CINEMATCH_THREADS", "4"))
+preload_app = True  # load the model once in the master, before forking
+
+
+def post_worker_init(worker):
+    import app
+
+    app.init_worker()
+    worker.log.info("Worker %s serving model %s", os.getpid(), app.model.version)
@@ -0,0 +1,91 @@
+import os
+import sqlite3
+import threading
+import time
+
+FIELDS = ("title", "poster_path", "backdrop_path", "release_date", "vote_average", "vote_count", "runtime")
+
+
+class MetadataStore:
+    """Local SQLite store of TMDB display metadata keyed by TMDB movie id.
+
+    The `id` column of tmdb_5000_movies.csv is the TMDB id, so posters and
+    backdrops for recommended movies can be looked up locally instead of
+    searching TMDB by title on every request.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS movies ("
+                "id INTEGER PRIMARY KEY, title TEXT, poster_path TEXT, backdrop_path TEXT, "
+                "release_date TEXT, vote_average REAL, vote_count INTEGER, runtime INTEGER, "
+                "fetched_at INTEGER NOT NULL)"
+            )
+
+    def reset_connections(self):
+        """Forget connections inherited from a parent process after fork"""
+        self._local = threading.local()
+
+    def _connect(self):
+        # SQLite connections cannot be shared across threads, keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, movie_ids):
+        """Return {id: metadata dict} for the ids present in the store"""
+        movie_ids = [int(i) for i in movie_ids]
+        conn = self._connect()
+        found = {}
+        # Stay under SQLite's bound-parameter limit for large id lists
+        for start in range(0, len(movie_ids), 500):
+            chunk = movie_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(f"SELECT * FROM movies WHERE id IN ({placeholders})", chunk).fetchall()
+            found.update((row["id"], dict(row)) for row in rows)
+        return found
+
+    def get(self, movie_id):
+        return self.get_many([movie_id]).get(int(movie_id))
+
+    def upsert_many(self, details_list):
+        """Store TMDB movie detail payloads, replacing older copies"""
+        now = int(time.time())
+        records = [
+            (int(details["id"]),) + tuple(details.get(field) for field in FIELDS) + (now,)
+            for details in details_list
+            if details and "id" in details
+        ]
+        if not records:
+            return 0
+        with self._connect() as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO movies (id, {', '.join(FIELDS)}, fetched_at) "
+                f"VALUES ({','.join('?' * (len(FIELDS) + 2))})",
+                records,
+            )
+        return len(records)
+
+    def upsert(self, details):
+        return self.upsert_many([details])
+
+    def stale_ids(self, movie_ids, max_age):
+        """Ids that are missing from the store or older than `max_age` seconds"""
+        cutoff = int(time.time()) - max_age
+        fresh = {
+            movie_id
+            for movie_id, row in self.get_many(movie_ids).items()
+            if row["fetched_at"] >= cutoff
+        }
+        return [int(i) for i in movie_ids if int(i) not in fresh]
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM movies").fetchone()[0]
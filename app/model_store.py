@@ -0,0 +1,295 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import numpy as np
+from scipy import sparse
+from catalog import Catalog
+from metrics import MODEL_STAGE_SECONDS
+from neighbors import InvertedNeighbors, SparseNeighbors, build_postings
+
+# Bump whenever the on-disk layout changes so old artifacts are rebuilt
+FORMAT_VERSION = 5
+NEIGHBOR_BACKENDS = ("exact", "inverted")
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+
+def file_checksum(path, chunk_size=1 << 20):
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _input_record(path, checksum=None):
+    stat = os.stat(path)
+    return {
+        "name": os.path.basename(path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": checksum or file_checksum(path),
+    }
+
+
+def input_fingerprint(paths):
+    """Describe the input CSVs and return (records, combined checksum)"""
+    records = [_input_record(path) for path in paths]
+    combined = hashlib.sha256("".join(r["sha256"] for r in records).encode()).hexdigest()
+    return records, combined
+
+
+def _write_json(path, data):
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _set_current(model_dir, version):
+    tmp_path = os.path.join(model_dir, f"{CURRENT_FILE}.tmp-{os.getpid()}")
+    with open(tmp_path, "w") as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(model_dir, CURRENT_FILE))
+
+
+def read_current_manifest(model_dir):
+    """Return the manifest of the active artifact, or None if there is none"""
+    try:
+        with open(os.path.join(model_dir, CURRENT_FILE)) as f:
+            version = f.read().strip()
+        with open(os.path.join(model_dir, version, MANIFEST_FILE), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format_version") != FORMAT_VERSION:
+        return None
+    return manifest
+
+
+def inputs_unchanged(manifest, paths):
+    """Cheap check of the recorded input stats against the files on disk.
+
+    Only size and mtime are compared, so an unchanged dataset costs two
+    stat calls. A mismatch is not proof of a change; `build_artifact`
+    hashes the files and reuses the artifact if the content is the same.
+    Missing inputs are treated as unchanged so a deployment can ship the
+    artifact without the raw CSVs.
+    """
+    recorded = manifest.get("inputs", [])
+    if len(recorded) != len(paths):
+        return False
+    for record, path in zip(recorded, paths):
+        if not os.path.exists(path):
+            continue
+        stat = os.stat(path)
+        if stat.st_size != record["size"] or stat.st_mtime_ns != record["mtime_ns"]:
+            return False
+    return True
+
+
+class ModelArtifact:
+    """A built model loaded from disk.
+
+    The catalog columns, TF-IDF vectors, neighbour index and IDF weights are
+    memory-mapped, so opening an artifact is cheap and the pages are shared by every
+    process that maps the same files.
+    """
+
+    def __init__(self, path, manifest, neighbor_options=None):
+        self.path = path
+        self.manifest = manifest
+        self.version = manifest["version"]
+        self.idf = np.load(os.path.join(path, "idf.npy"), mmap_mode="r")
+        self.vectors = sparse.csr_matrix(
+            (
+                np.load(os.path.join(path, "vectors_data.npy"), mmap_mode="r"),
+                np.load(os.path.join(path, "vectors_indices.npy"), mmap_mode="r"),
+                np.load(os.path.join(path, "vectors_indptr.npy"), mmap_mode="r"),
+            ),
+            shape=(manifest["n_movies"], manifest["n_features"]),
+            copy=False,
+        )
+        # Inverted index (term -> movies), used by text queries and the
+        # "inverted" neighbour backend
+        self.postings = sparse.csr_matrix(
+            (self._load("postings_data"), self._load("postings_indices"), self._load("postings_indptr")),
+            shape=(manifest["n_features"], manifest["n_movies"]),
+            copy=False,
+        )
+        self.neighbors = self._open_neighbors(neighbor_options)
+        self.catalog = Catalog.load(path)
+        self._vocabulary = None
+
+    def _load(self, name):
+        return np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r")
+
+    def _open_neighbors(self, options):
+        backend = self.manifest.get("neighbor_backend", "exact")
+        if backend == "inverted":
+            return InvertedNeighbors(self.vectors, self.postings, **(options or {}))
+        return SparseNeighbors(self.vectors, self._load("neighbors"), self._load("neighbor_scores"), self.postings)
+
+    @property
+    def vocabulary(self):
+        """Fitted TF-IDF vocabulary (term -> column), loaded on first use"""
+        if self._vocabulary is None:
+            with open(os.path.join(self.path, "vocabulary.json"), encoding="utf-8") as f:
+                self._vocabulary = json.load(f)
+        return self._vocabulary
+
+    @classmethod
+    def open(cls, model_dir, manifest=None, neighbor_options=None):
+        manifest = manifest or read_current_manifest(model_dir)
+        if manifest is None:
+            raise FileNotFoundError(f"No model artifact found in {model_dir}")
+        return cls(os.path.join(model_dir, manifest["version"]), manifest, neighbor_options)
+
+
+def _build_neighbors(movie_vectors, top_k, backend):
+    """Arrays of the chosen neighbour backend, keyed by artifact file name.
+
+    "exact" precomputes a top-K table with a blocked all-pairs scan, which is
+    quadratic in the catalog size. "inverted" needs nothing beyond the
+    postings every artifact carries.
+    """
+    if backend == "exact":
+        from pipeline import top_k_neighbors
+        neighbors, neighbor_scores = top_k_neighbors(movie_vectors, top_k)
+        return {"neighbors": neighbors, "neighbor_scores": neighbor_scores}
+    if backend == "inverted":
+        return {}
+    raise ValueError(f"Unknown neighbour backend {backend!r}, expected one of {NEIGHBOR_BACKENDS}")
+
+
+def artifact_version(checksum, top_k, backend):
+    """Directory name of an artifact: format, input checksum and neighbour index.
+
+    Each backend (and each exact table width) gets its own directory, so
+    switching between them never rewrites an artifact that running workers
+    have memory-mapped; CURRENT just points at another directory.
+    """
+    index = f"exact{top_k}" if backend == "exact" else backend
+    return f"v{FORMAT_VERSION}-{checksum[:12]}-{index}"
+
+
+def _manifest_matches(manifest, top_k, backend):
+    """Whether an existing artifact already provides the requested neighbour index"""
+    if manifest.get("neighbor_backend", "exact") != backend:
+        return False
+    return backend != "exact" or manifest.get("top_k", 0) >= min(top_k, manifest["n_movies"] - 1)
+
+
+def _write_artifact(path, movies, tfidf, movie_vectors, index_arrays):
+    os.makedirs(path)
+    np.save(os.path.join(path, "vectors_data.npy"), movie_vectors.data)
+    np.save(os.path.join(path, "vectors_indices.npy"), movie_vectors.indices)
+    np.save(os.path.join(path, "vectors_indptr.npy"), movie_vectors.indptr)
+    postings = build_postings(movie_vectors)
+    np.save(os.path.join(path, "postings_data.npy"), postings.data)
+    np.save(os.path.join(path, "postings_indices.npy"), postings.indices)
+    np.save(os.path.join(path, "postings_indptr.npy"), postings.indptr)
+    for name, array in index_arrays.items():
+        np.save(os.path.join(path, f"{name}.npy"), array)
+    np.save(os.path.join(path, "idf.npy"), tfidf.idf_.astype(np.float32))
+    vocabulary = {term: int(col) for term, col in tfidf.vocabulary_.items()}
+    _write_json(os.path.join(path, "vocabulary.json"), vocabulary)
+    Catalog.from_movies(movies).save(path)
+
+
+def _run_stage(stage_seconds, name, fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    stage_seconds[name] = time.perf_counter() - started
+    MODEL_STAGE_SECONDS.observe(stage_seconds[name], stage=name)
+    return result
+
+
+def build_artifact(movies_path, credits_path, model_dir, top_k, force=False,
+                   backend="exact", neighbor_options=None, workers=None):
+    """Run the offline pipeline and write a versioned artifact.
+
+    The artifact directory is named after the format version, the
+    checksum of the input CSVs and the neighbour index (see
+    artifact_version), so an unchanged dataset resolves to the existing
+    artifact and is not rebuilt unless `force` is set. `neighbor_options` are the
+    query-time settings of the "inverted" backend (terms, candidates).
+    `workers` is the number of processes parsing the CSVs (default: CPU count).
+    """
+    inputs, checksum = input_fingerprint([movies_path, credits_path])
+    version = artifact_version(checksum, top_k, backend)
+    path = os.path.join(model_dir, version)
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    os.makedirs(model_dir, exist_ok=True)
+
+    if not force and os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if _manifest_matches(manifest, top_k, backend):
+            # Same data, new timestamps: refresh the recorded stats so the
+            # next startup does not need to hash the inputs again
+            manifest["inputs"] = inputs
+            _write_json(manifest_path, manifest)
+            _set_current(model_dir, version)
+            print(f"Model {version} is up to date")
+            return ModelArtifact(path, manifest, neighbor_options)
+    if backend not in NEIGHBOR_BACKENDS:
+        raise ValueError(f"Unknown neighbour backend {backend!r}, expected one of {NEIGHBOR_BACKENDS}")
+
+    # Imported here so serving from a prebuilt artifact never loads sklearn
+    from pipeline import ingest, build_vectors
+
+    started = time.time()
+    print(f"Building model {version}...")
+    stage_seconds = {}
+    movies = _run_stage(stage_seconds, "ingest", ingest, movies_path, credits_path,
+                        os.path.join(model_dir, "ingest"), checksum, workers)
+    tfidf, movie_vectors = _run_stage(stage_seconds, "build_vectors", build_vectors, movies)
+    index_arrays = _run_stage(stage_seconds, "neighbor_index", _build_neighbors, movie_vectors, top_k, backend)
+
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    _run_stage(stage_seconds, "write_artifact", _write_artifact,
+               tmp_path, movies, tfidf, movie_vectors, index_arrays)
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "version": version,
+        "checksum": checksum,
+        "inputs": inputs,
+        "created_at": int(time.time()),
+        "n_movies": int(len(movies)),
+        "n_features": int(len(tfidf.vocabulary_)),
+        "top_k": int(index_arrays["neighbors"].shape[1]) if backend == "exact" else 0,
+        "neighbor_backend": backend,
+        "stage_seconds": stage_seconds,
+    }
+    _write_json(os.path.join(tmp_path, MANIFEST_FILE), manifest)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+    _set_current(model_dir, version)
+    print(f"Built model {version} in {time.time() - started:.1f}s")
+    return ModelArtifact(path, manifest, neighbor_options)
+
+
+def load_or_build(movies_path, credits_path, model_dir, top_k, backend="exact", neighbor_options=None):
+    """Open the current artifact, rebuilding it only if the inputs or the backend changed.
+
+    This runs at server import, so a rebuild here parses the CSVs in this
+    process: under the spawn start method (Windows, macOS) a process pool
+    would re-import the server in every child. `build_model.py` is the
+    parallel path.
+    """
+    paths = [movies_path, credits_path]
+    manifest = read_current_manifest(model_dir)
+    if manifest is not None and _manifest_matches(manifest, top_k, backend):
+        if inputs_unchanged(manifest, paths):
+            return _run_stage({}, "load_artifact", ModelArtifact.open, model_dir, manifest, neighbor_options)
+    if not all(os.path.exists(path) for path in paths):
+        if manifest is not None:
+            print("Input CSVs not found, serving the existing model artifact")
+            return ModelArtifact.open(model_dir, manifest, neighbor_options)
+        raise FileNotFoundError(f"No model artifact in {model_dir} and input CSVs are missing")
+    return build_artifact(movies_path, credits_path, model_dir, top_k,
+                          backend=backend, neighbor_options=neighbor_options, workers=1)
@@ -0,0 +1,152 @@
+import numpy as np
+from scipy import sparse
+
+
+def select_top_k(scores, k):
+    """Indices of the k largest scores along the last axis, best first.
+
+    Uses a partial selection (argpartition) so only the k winners are
+    sorted, instead of sorting the whole row.
+    """
+    n = scores.shape[-1]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.int64)
+    top = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=-1), axis=-1, kind="stable")
+    return np.take_along_axis(top, order, axis=-1)
+
+
+def top_k_dot(queries, vectors_t, k, exclude=None, chunk_size=None):
+    """Top k catalog rows by dot product for every query row.
+
+    `queries` is a sparse (m x F) matrix and `vectors_t` the transposed
+    catalog (F x N). Scores are computed a block of queries at a time so
+    the full m x N matrix never exists; by default blocks hold about 16M
+    scores whatever the catalog size. `exclude` is an optional sparse
+    (m x N) matrix whose non-zero entries are never returned (the seeds
+    themselves). Returns (indices, scores) of shape (m, k), best first.
+    """
+    m, n = queries.shape[0], vectors_t.shape[1]
+    chunk_size = chunk_size or max(1, min(1024, (16 << 20) // max(n, 1)))
+    k = max(0, min(k, n))
+    indices = np.zeros((m, k), dtype=np.int32)
+    scores = np.zeros((m, k), dtype=np.float32)
+    if k == 0:
+        return indices, scores
+    exclude = exclude.tocsr() if exclude is not None else None
+    for start in range(0, m, chunk_size):
+        stop = min(start + chunk_size, m)
+        block = (queries[start:stop] @ vectors_t).toarray()
+        if exclude is not None:
+            block[exclude[start:stop].nonzero()] = -np.inf
+        top = select_top_k(block, k)
+        indices[start:stop] = top
+        scores[start:stop] = np.take_along_axis(block, top, axis=1)
+    return indices, scores
+
+
+class SparseNeighbors:
+    """Exact cosine neighbours over L2-normalised sparse TF-IDF vectors.
+
+    Rows are unit length, so the cosine similarity of one movie against the
+    catalog is a single sparse dot product and no N x N matrix is ever kept.
+    An optional precomputed neighbour table answers small queries without
+    touching the vectors at all. `postings` (the transposed vectors) is
+    used for batch scoring and computed on first use when not given.
+    """
+
+    def __init__(self, vectors, table=None, table_scores=None, postings=None):
+        self.vectors = vectors
+        self.table = table
+        self.table_scores = table_scores
+        self.postings = postings
+
+    def scores(self, idx):
+        """Cosine similarity of movie `idx` against every movie"""
+        return (self.vectors @ self.vectors[idx].T).toarray().ravel()
+
+    def query(self, idx, k):
+        """Return (indices, scores) of the k most similar movies to `idx`"""
+        if self.table is not None and k <= self.table.shape[1]:
+            return np.asarray(self.table[idx, :k]), np.asarray(self.table_scores[idx, :k])
+        scores = self.scores(idx)
+        scores[idx] = -np.inf  # never recommend the seed itself
+        top = select_top_k(scores, min(k, len(scores) - 1))
+        return top, scores[top]
+
+    def query_many(self, indices, k):
+        """Exact top k for many seeds at once; returns (m x k) (indices, scores)"""
+        indices = np.asarray(indices, dtype=np.int64)
+        n = self.vectors.shape[0]
+        k = min(k, n - 1)
+        if self.table is not None and k <= self.table.shape[1]:
+            return np.asarray(self.table[indices, :k]), np.asarray(self.table_scores[indices, :k])
+        seeds = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float32), (np.arange(len(indices)), indices)),
+            shape=(len(indices), n),
+        )
+        return top_k_dot(self.vectors[indices], self._transposed(), k, exclude=seeds)
+
+    def query_profiles(self, weights, k):
+        """Top k for weighted seed sets, e.g. watch histories.
+
+        `weights` is a sparse (users x N) matrix of seed weights. Each row's
+        profile is the weighted sum of its seeds' unit vectors, scored by
+        cosine against the catalog; the seeds themselves are excluded.
+        """
+        weights = sparse.csr_matrix(weights, dtype=np.float32)
+        profiles = weights @ self.vectors
+        norms = np.sqrt(np.asarray(profiles.multiply(profiles).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        profiles = sparse.diags(1.0 / norms).astype(np.float32) @ profiles
+        return top_k_dot(profiles.tocsr(), self._transposed(), k, exclude=weights)
+
+    def _transposed(self):
+        if self.postings is None:
+            self.postings = build_postings(self.vectors)
+        return self.postings
+
+
+
+def build_postings(vectors):
+    """Inverted index of the vectors: row t lists the movies containing term t"""
+    return vectors.T.tocsr()
+
+
+class InvertedNeighbors(SparseNeighbors):
+    """Approximate cosine neighbours through an inverted term -> movies index.
+
+    Two TF-IDF vectors only score well if they share heavily weighted
+    terms. A query takes the seed's `terms` highest-weighted terms, sums
+    their contributions over those terms' posting lists (a partial dot
+    product that only touches movies sharing them) and ranks the best
+    `candidates` of those by exact cosine. Raising either knob raises
+    recall and latency. Building the index is a transpose, O(nnz).
+    """
+
+    def __init__(self, vectors, postings, terms=8, candidates=200):
+        super().__init__(vectors, postings=postings)
+        self.terms = terms
+        self.candidates = candidates
+
+    def shortlist(self, vector, exclude=None):
+        """Positions of the movies with the best partial scores for `vector`"""
+        strongest = select_top_k(vector.data, self.terms)
+        weights = sparse.csr_matrix(vector.data[strongest][None, :])
+        partial = weights @ self.postings[vector.indices[strongest]]
+        positions, scores = partial.indices.astype(np.int64), partial.data
+        if exclude is not None:
+            keep = positions != exclude
+            positions, scores = positions[keep], scores[keep]
+        return positions[select_top_k(scores, self.candidates)]
+
+    def query(self, idx, k):
+        """Return (indices, scores) of approximately the k most similar movies"""
+        seed = self.vectors[idx]
+        shortlist = self.shortlist(seed, exclude=idx)
+        if len(shortlist) < k:
+            return super().query(idx, k)
+        scores = (self.vectors[shortlist] @ seed.T).toarray().ravel()
+        top = select_top_k(scores, k)
+        return shortlist[top], scores[top]
@@ -0,0 +1,47 @@
+import gzip
+import hashlib
+import json
+from flask import Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+
+class PrecomputedPayload:
+    """A JSON body serialised and compressed once, served with a strong ETag.
+
+    Used for responses that only change with the model version, so each
+    hit is a header check and a memory copy instead of re-serialising.
+    """
+
+    def __init__(self, data, version, max_age=3600):
+        self.body = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(self.body).hexdigest()[:16]
+        self.etag = f"{version}-{digest}"
+        self.max_age = max_age
+        self.encoded = {"gzip": gzip.compress(self.body, compresslevel=9)}
+        if brotli is not None:
+            self.encoded["br"] = brotli.compress(self.body, quality=11)
+
+    def _pick_encoding(self, request):
+        best, best_size = None, len(self.body)
+        for encoding, body in self.encoded.items():
+            if request.accept_encodings[encoding] and len(body) < best_size:
+                best, best_size = encoding, len(body)
+        return best
+
+    def response(self, request):
+        """Build the response for `request`, answering 304 when the ETag matches"""
+        if request.if_none_match.contains(self.etag):
+            response = Response(status=304)
+        else:
+            encoding = self._pick_encoding(request)
+            response = Response(self.encoded[encoding] if encoding else self.body, mimetype="application/json")
+            if encoding:
+                response.headers["Content-Encoding"] = encoding
+        response.set_etag(self.etag)
+        response.headers["Cache-Control"] = f"public, max-age={self.max_age}"
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
@@ -0,0 +1,163 @@
+import ast
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+from neighbors import top_k_dot
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # orjson is optional; the stdlib parser is slower but equivalent
+    _loads = json.loads
+
+try:
+    import pyarrow  # noqa: F401
+    _CACHE_EXT = "parquet"
+except ImportError:  # without pyarrow the parsed catalog is cached as a pickle
+    _CACHE_EXT = "pkl"
+
+JSON_COLUMNS = ["genres", "keywords", "cast", "crew"]
+# Columns kept after ingestion; everything else in the CSVs is dropped
+INGEST_COLUMNS = [
+    "id", "title_x", "overview", "release_date", "vote_average", "vote_count",
+    "genres", "keywords", "cast", "crew", "tags",
+]
+# Below this many rows a process pool costs more than it saves
+PARALLEL_MIN_ROWS = 2000
+
+
+def load_data(movies_path, credits_path):
+    movies = pd.read_csv(movies_path)
+    credits = pd.read_csv(credits_path)
+    movies = movies.merge(credits, left_on="id", right_on="movie_id")
+    return movies
+
+def _load_cell(text):
+    # The TMDB cells are JSON; fall back to Python literals for odd rows
+    try:
+        return _loads(text)
+    except (ValueError, TypeError):
+        return ast.literal_eval(text)
+
+def parse_json_column(text):
+    try:
+        data = _load_cell(text)
+        return [d["name"] for d in data]
+    except:
+        return []
+
+def get_top_cast(text):
+    try:
+        data = _load_cell(text)
+        return [d["name"] for d in data[:3]]
+    except:
+        return []
+
+
+def get_director(text):
+    try:
+        data = _load_cell(text)
+        for d in data:
+            if d.get("job") == "Director":
+                return d["name"]
+        return ""
+    except:
+        return ""
+
+def _parse_chunk(chunk):
+    """Parse one chunk of the JSON columns (runs in a worker process)"""
+    return {
+        "genres": [parse_json_column(text) for text in chunk["genres"]],
+        "keywords": [parse_json_column(text) for text in chunk["keywords"]],
+        "cast": [get_top_cast(text) for text in chunk["cast"]],
+        "crew": [get_director(text) for text in chunk["crew"]],
+    }
+
+def parse_json_columns(movies, workers=None):
+    """Parse the JSON columns in one pass each, spread over a process pool"""
+    workers = workers or os.cpu_count() or 1
+    columns = {name: movies[name].tolist() for name in JSON_COLUMNS}
+    n = len(movies)
+    if workers <= 1 or n < PARALLEL_MIN_ROWS:
+        return _parse_chunk(columns)
+
+    chunk_size = -(-n // (workers * 4))  # a few chunks per worker to balance load
+    chunks = [
+        {name: values[start:start + chunk_size] for name, values in columns.items()}
+        for start in range(0, n, chunk_size)
+    ]
+    parsed = {name: [] for name in JSON_COLUMNS}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(_parse_chunk, chunks):
+            for name in JSON_COLUMNS:
+                parsed[name].extend(result[name])
+    return parsed
+
+def preprocess(movies, workers=None):
+    parsed = parse_json_columns(movies, workers)
+    for name in JSON_COLUMNS:
+        movies[name] = parsed[name]
+    movies["overview"] = movies["overview"].fillna("")
+    movies["tags"] = (
+        movies["overview"]
+        + " "
+        + movies["genres"].apply(lambda x: " ".join(x))
+        + " "
+        + movies["keywords"].apply(lambda x: " ".join(x))
+        + " "
+        + movies["cast"].apply(lambda x: " ".join(x))
+        + " "
+        + movies["crew"]
+    )
+    return movies
+
+def ingest(movies_path, credits_path, cache_dir, checksum, workers=None):
+    """Load and preprocess the CSVs, caching the parsed result by input checksum.
+
+    Re-ingesting an unchanged dataset reads the cached columnar file instead
+    of parsing the CSVs again. Older cache files are removed.
+    """
+    cache_path = os.path.join(cache_dir, f"{checksum[:16]}.{_CACHE_EXT}")
+    if os.path.exists(cache_path):
+        if _CACHE_EXT == "pkl":
+            return pd.read_pickle(cache_path)
+        movies = pd.read_parquet(cache_path)
+        for name in ["genres", "keywords", "cast"]:
+            movies[name] = movies[name].map(list)  # Arrow list columns load as arrays
+        return movies
+
+    movies = preprocess(load_data(movies_path, credits_path), workers)[INGEST_COLUMNS]
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{cache_path}.tmp-{os.getpid()}"
+    if _CACHE_EXT == "parquet":
+        movies.to_parquet(tmp_path, index=False)
+    else:
+        movies.to_pickle(tmp_path)
+    os.replace(tmp_path, cache_path)
+    for name in os.listdir(cache_dir):
+        if name != os.path.basename(cache_path) and ".tmp-" not in name:
+            os.remove(os.path.join(cache_dir, name))
+    return movies
+
+def build_vectors(movies):
+    """Fit the TF-IDF model and return (vectorizer, L2-normalised sparse vectors)"""
+    tfidf = TfidfVectorizer(stop_words="english", max_features=5000)
+    movie_vectors = normalize(tfidf.fit_transform(movies["tags"]), norm="l2", copy=False)
+    return tfidf, movie_vectors.astype(np.float32).tocsr()
+
+def top_k_neighbors(movie_vectors, k, chunk_size=None):
+    """Compute the k most similar movies for every movie.
+
+    Returns (indices, scores) arrays of shape (N, k) sorted by descending
+    similarity, excluding the movie itself; see neighbors.top_k_dot for
+    how memory stays bounded.
+    """
+    n = movie_vectors.shape[0]
+    k = max(0, min(k, n - 1))
+    return top_k_dot(movie_vectors, movie_vectors.T.tocsr(), k, exclude=sparse.identity(n, format="csr"),
+                     chunk_size=chunk_size)
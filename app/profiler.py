@@ -0,0 +1,66 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class SlowRequestProfiler:
+    """Opt-in sampling profiler that keeps stacks only for slow requests.
+
+    One daemon thread samples the stacks of threads currently serving a
+    request every `interval` seconds. When a request finishes slower than
+    `threshold` seconds its samples are written in collapsed-stack format
+    (one "frame;frame;frame count" line per stack, ready for flamegraph
+    tools); samples of fast requests are discarded. Nothing runs unless
+    the profiler is enabled.
+    """
+
+    def __init__(self, threshold, output_dir, interval=0.005):
+        self.threshold = threshold
+        self.output_dir = output_dir
+        self.interval = interval
+        self._active = {}  # thread id -> Counter of collapsed stacks
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="slow-request-profiler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._active:
+                    continue
+                frames = sys._current_frames()
+                for thread_id, samples in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        samples[self._collapse(frame)] += 1
+
+    @staticmethod
+    def _collapse(frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(stack))
+
+    def start_request(self):
+        with self._lock:
+            self._active[threading.get_ident()] = Counter()
+
+    def finish_request(self, name, duration):
+        """Stop sampling this thread; returns the profile path if it was slow"""
+        with self._lock:
+            samples = self._active.pop(threading.get_ident(), None)
+        if samples is None or duration < self.threshold or not samples:
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        safe_name = "".join(c if c.isalnum() else "_" for c in name).strip("_") or "root"
+        path = os.path.join(self.output_dir, f"{int(time.time() * 1000)}-{safe_name}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+        print(f"Slow request {name} took {duration * 1000:.0f}ms, profile written to {path}")
+        return path
@@ -0,0 +1,248 @@
+import heapq
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+INTERACTIVE = 0  # a user is waiting on the response
+BACKGROUND = 1  # warmers, backfills and stale-while-revalidate refreshes
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+
+def retry_after_seconds(value, now=None):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - (now or time.time()))
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+class LocalBucket:
+    """Token bucket state held in this process"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, floor):
+        """Take one token if at least `floor` are left; returns 0, or the seconds to wait"""
+        now = time.monotonic()
+        self._refill(now)
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.tokens >= floor:
+            self.tokens -= 1.0
+            return 0.0
+        return (floor - self.tokens) / self.rate
+
+    def pause(self, seconds):
+        """Issue no tokens for `seconds`; returns True if that extends the current pause"""
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens = min(self.tokens, 0.0)  # resume gently, not with a full burst
+        if now + seconds > self.paused_until:
+            self.paused_until = now + seconds
+            return True
+        return False
+
+    def state(self):
+        """(tokens, seconds of pause left)"""
+        now = time.monotonic()
+        self._refill(now)
+        return self.tokens, max(0.0, self.paused_until - now)
+
+
+class SharedBucket:
+    """Token bucket state in a SQLite file, shared by every process on the host.
+
+    Server workers and the warm_metadata command all draw from the same
+    quota, and a 429 seen by one of them pauses them all. Each take is one
+    short write transaction; the wall clock is used since the processes
+    share no monotonic clock.
+    """
+
+    def __init__(self, path, rate, burst):
+        self.path = path
+        self.rate = rate
+        self.burst = burst
+        self._conn = None
+        self._pid = None
+
+    def _connect(self):
+        # Opened per process (a preloaded master must not hand its connection
+        # to forked workers). Only used under the limiter's lock, so one
+        # connection serves every thread.
+        if self._pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bucket ("
+                "id INTEGER PRIMARY KEY CHECK (id = 0), tokens REAL NOT NULL, "
+                "updated REAL NOT NULL, paused_until REAL NOT NULL)"
+            )
+            conn.execute("INSERT OR IGNORE INTO bucket VALUES (0, ?, ?, 0)", (self.burst, time.time()))
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def _update(self, change):
+        """Run change(tokens, paused_until, now) -> (tokens, paused_until, result) in one transaction"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            tokens, updated, paused_until = conn.execute(
+                "SELECT tokens, updated, paused_until FROM bucket WHERE id = 0"
+            ).fetchone()
+            now = time.time()
+            tokens = min(self.burst, tokens + max(0.0, now - updated) * self.rate)
+            tokens, paused_until, result = change(tokens, paused_until, now)
+            conn.execute(
+                "UPDATE bucket SET tokens = ?, updated = ?, paused_until = ? WHERE id = 0",
+                (tokens, now, paused_until),
+            )
+            conn.execute("COMMIT")
+            return result
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+    def take(self, floor):
+        def change(tokens, paused_until, now):
+            if now < paused_until:
+                return tokens, paused_until, paused_until - now
+            if tokens >= floor:
+                return tokens - 1.0, paused_until, 0.0
+            return tokens, paused_until, (floor - tokens) / self.rate
+        return self._update(change)
+
+    def pause(self, seconds):
+        def change(tokens, paused_until, now):
+            extends = now + seconds > paused_until
+            return min(tokens, 0.0), max(paused_until, now + seconds), extends
+        return self._update(change)
+
+    def state(self):
+        return self._update(lambda tokens, paused_until, now: (
+            tokens, paused_until, (tokens, max(0.0, paused_until - now))
+        ))
+
+
+class PriorityRateLimiter:
+    """Token bucket that hands out tokens by priority, then arrival order.
+
+    Tokens refill at `rate` per second up to `burst`. Callers queue for a
+    token with a deadline: interactive callers are always served before
+    background ones, and background callers may not dip into the last
+    `reserve` tokens. Background work therefore runs at the full refill
+    rate while leaving headroom for a burst of user requests. A caller
+    still queued at its deadline gives up (acquire returns False) instead
+    of making a late request. `pause()` stops issuing tokens for a while,
+    e.g. for the Retry-After of a 429 response.
+
+    With `shared_path` the bucket lives in a SQLite file (SharedBucket), so
+    the rate is a host-wide quota shared with other processes. Queue order
+    applies within this process; across processes, the reserve keeps
+    background callers from draining the tokens interactive ones need. If
+    the file cannot be used (or there is none), the limiter uses a
+    per-process bucket at `fallback_rate` (the process's share of the quota).
+    """
+
+    def __init__(self, rate, burst, reserve=0, shared_path=None, fallback_rate=None):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.reserve = min(float(reserve), self.burst - 1)
+        self.fallback_rate = float(fallback_rate if fallback_rate is not None else rate)
+        if shared_path and self.rate > 0:
+            self._bucket = SharedBucket(shared_path, self.rate, self.burst)
+        else:
+            self.rate = self.fallback_rate if self.rate > 0 else self.rate
+            self._bucket = LocalBucket(self.rate, self.burst)
+        self._queue = []  # heap of [priority, seq, cancelled]
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self.granted = {INTERACTIVE: 0, BACKGROUND: 0}
+        self.expired = {INTERACTIVE: 0, BACKGROUND: 0}
+        self.pauses = 0
+
+    @property
+    def shared(self):
+        return isinstance(self._bucket, SharedBucket)
+
+    def _head(self):
+        while self._queue and self._queue[0][2]:
+            heapq.heappop(self._queue)
+        return self._queue[0] if self._queue else None
+
+    def _call(self, method, *args):
+        """Call the bucket, falling back to a per-process bucket if the shared one fails"""
+        try:
+            return getattr(self._bucket, method)(*args)
+        except (sqlite3.Error, OSError) as e:
+            print(f"TMDB rate limit: shared state unavailable ({e}), limiting per process")
+            self.rate = self.fallback_rate
+            self._bucket = LocalBucket(self.rate, self.burst)
+            return getattr(self._bucket, method)(*args)
+
+    def acquire(self, priority=INTERACTIVE, deadline=None):
+        """Wait for a token until `deadline` (time.monotonic() value, None waits forever)"""
+        if self.rate <= 0:
+            return True  # limiter disabled
+        entry = [priority, next(self._seq), False]
+        floor = 1.0 + (self.reserve if priority != INTERACTIVE else 0.0)
+        with self._cond:
+            heapq.heappush(self._queue, entry)
+            while True:
+                wait = self._call("take", floor) if self._head() is entry else None
+                if wait == 0.0:
+                    heapq.heappop(self._queue)
+                    self.granted[priority] += 1
+                    self._cond.notify_all()
+                    return True
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    entry[2] = True
+                    self.expired[priority] += 1
+                    self._cond.notify_all()
+                    return False
+                if wait is None:
+                    wait = 1.0  # not at the head: woken when the queue moves
+                if deadline is not None:
+                    wait = min(wait, deadline - now)
+                self._cond.wait(max(wait, 0.001))
+
+    def pause(self, seconds):
+        """Issue no tokens for `seconds` (backpressure from the upstream)"""
+        with self._cond:
+            if self._call("pause", seconds):
+                self.pauses += 1
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            tokens, paused_for = self._call("state")
+            return {
+                "rate": self.rate,
+                "shared": self.shared,
+                "tokens": round(tokens, 2),
+                "queued": sum(1 for entry in self._queue if not entry[2]),
+                "paused_for": round(paused_for, 3),
+                "pauses": self.pauses,
+                "granted": {PRIORITY_NAMES[p]: n for p, n in self.granted.items()},
+                "expired": {PRIORITY_NAMES[p]: n for p, n in self.expired.items()},
+            }
@@ -0,0 +1,51 @@
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait for and share the same result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def _claim(self, key):
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def _run(self, key, future, fn, args):
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                if self._calls.get(key) is future:
+                    del self._calls[key]
+
+    def do(self, key, fn, *args):
+        """Run fn(*args) in the calling thread, or wait for the in-flight call"""
+        future, leader = self._claim(key)
+        if leader:
+            self._run(key, future, fn, args)
+        return future.result()
+
+    def submit(self, key, executor, fn, *args):
+        """Run fn(*args) on `executor` unless already in flight; returns the Future"""
+        future, leader = self._claim(key)
+        if leader:
+            executor.submit(self._run, key, future, fn, args)
+        return future
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,56 @@
+import re
+from collections import Counter
+import numpy as np
+from scipy import sparse
+from neighbors import select_top_k
+
+# TfidfVectorizer's default tokenisation: lowercase words of 2+ characters
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+
+
+class TextSearch:
+    """Score free text against the catalog in the model's TF-IDF space.
+
+    The text is weighted the way the fitted vectorizer weights a movie:
+    term counts times the stored IDF, then L2-normalised. That makes its
+    dot product with a movie vector their cosine similarity. Words outside
+    the vocabulary (stop words included) are dropped. Scores are summed
+    over the posting lists of the query's terms only, so movies sharing no
+    term with the text are never touched. Rebuilding the weighting from the
+    vocabulary and IDF keeps sklearn out of the server.
+    """
+
+    def __init__(self, vocabulary, idf, postings, max_terms=32):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.postings = postings
+        self.max_terms = max_terms
+
+    def vectorize(self, text):
+        """(terms, columns, weights) of the text's TF-IDF vector, strongest first"""
+        counts = Counter(t for t in TOKEN_PATTERN.findall(text.lower()) if t in self.vocabulary)
+        if not counts:
+            return [], np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        terms = list(counts)
+        columns = np.array([self.vocabulary[t] for t in terms], dtype=np.int64)
+        weights = np.array([counts[t] for t in terms], dtype=np.float32) * self.idf[columns]
+        weights /= np.linalg.norm(weights)
+        order = np.argsort(-weights, kind="stable")[:self.max_terms]
+        return [terms[i] for i in order], columns[order], weights[order]
+
+    def search(self, text, k, mask=None):
+        """Return (positions, scores, terms) of the k best matches for `text`.
+
+        `mask` is an optional boolean array over the catalog restricting the
+        movies that may be returned (genre / year filters).
+        """
+        terms, columns, weights = self.vectorize(text)
+        if not terms:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32), terms
+        scores = sparse.csr_matrix(weights[None, :]) @ self.postings[columns]
+        positions, values = scores.indices.astype(np.int64), scores.data
+        if mask is not None:
+            keep = mask[positions]
+            positions, values = positions[keep], values[keep]
+        top = select_top_k(values, k)
+        return positions[top], values[top], terms
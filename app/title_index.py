@@ -0,0 +1,137 @@
+import bisect
+import heapq
+import re
+import unicodedata
+from collections import Counter
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_title(title):
+    """Lowercase, strip accents and punctuation, collapse whitespace"""
+    text = unicodedata.normalize("NFKD", str(title or ""))
+    text = text.encode("ascii", "ignore").decode("ascii").lower()
+    return _NON_ALNUM.sub(" ", text).strip()
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TitleIndex:
+    """Lookup structures over the local catalog titles.
+
+    - an exact map of normalised title -> catalog positions
+    - a sorted prefix index over every word-start suffix of each title, so
+      "knight" finds "The Dark Knight" with two binary searches
+    - a trigram index for typo-tolerant matching
+
+    Ties are broken by `popularity` (vote count), most popular first.
+    """
+
+    # Minimum trigram similarity for a fuzzy match to resolve a title
+    FUZZY_THRESHOLD = 0.5
+
+    def __init__(self, titles, ids, popularity):
+        self.titles = list(titles)
+        self.popularity = list(popularity)
+        self.exact = {}
+        self.positions_by_id = {int(movie_id): pos for pos, movie_id in enumerate(ids)}
+        self.normalized = [normalize_title(title) for title in self.titles]
+        self.trigram_postings = {}
+        self.trigram_counts = []
+
+        prefix_entries = []
+        for pos, name in enumerate(self.normalized):
+            self.exact.setdefault(name, []).append(pos)
+            words = name.split(" ")
+            for start in range(len(words)):
+                # Word-start suffixes; 0 marks the full title for ranking
+                prefix_entries.append((" ".join(words[start:]), 0 if start == 0 else 1, pos))
+            grams = trigrams(name)
+            self.trigram_counts.append(len(grams))
+            for gram in grams:
+                self.trigram_postings.setdefault(gram, []).append(pos)
+        for positions in self.exact.values():
+            positions.sort(key=lambda p: -self.popularity[p])
+        prefix_entries.sort()
+        self.prefix_keys = [entry[0] for entry in prefix_entries]
+        self.prefix_entries = [(entry[1], entry[2]) for entry in prefix_entries]
+
+    def resolve(self, title, fuzzy=True):
+        """Catalog position for a title, or None.
+
+        Exact (normalised) matches win; otherwise the closest trigram match
+        is accepted if it is similar enough.
+        """
+        name = normalize_title(title)
+        if not name:
+            return None
+        positions = self.exact.get(name)
+        if positions:
+            return positions[0]
+        if fuzzy:
+            matches = self._fuzzy(name, 1)
+            if matches and matches[0][0] >= self.FUZZY_THRESHOLD:
+                return matches[0][1]
+        return None
+
+    def resolve_id(self, movie_id):
+        """Catalog position for a TMDB id, or None"""
+        try:
+            return self.positions_by_id.get(int(movie_id))
+        except (TypeError, ValueError):
+            return None
+
+    def _prefix(self, name, limit):
+        lo = bisect.bisect_left(self.prefix_keys, name)
+        hi = bisect.bisect_left(self.prefix_keys, name + "\x7f")
+        # Full-title prefixes before word prefixes, then by popularity. A title
+        # can appear more than once in the range, so over-select before dedup.
+        ranked = heapq.nsmallest(
+            limit * 3, self.prefix_entries[lo:hi], key=lambda e: (e[0], -self.popularity[e[1]])
+        )
+        seen = set()
+        results = []
+        for _, pos in ranked:
+            if pos not in seen:
+                seen.add(pos)
+                results.append(pos)
+                if len(results) == limit:
+                    break
+        return results
+
+    def _fuzzy(self, name, limit):
+        grams = trigrams(name)
+        counts = Counter()
+        for gram in grams:
+            counts.update(self.trigram_postings.get(gram, ()))
+        scored = []
+        for pos, shared in counts.items():
+            total = len(grams) + self.trigram_counts[pos] - shared
+            scored.append((shared / total, self.popularity[pos], pos))
+        best = heapq.nlargest(limit, scored)
+        return [(score, pos) for score, _, pos in best]
+
+    def suggest(self, query, limit=10):
+        """Ranked catalog positions for an autocomplete query"""
+        name = normalize_title(query)
+        if not name:
+            return []
+        results = list(self.exact.get(name, []))[:limit]
+        if len(results) < limit:
+            for pos in self._prefix(name, limit):
+                if pos not in results:
+                    results.append(pos)
+                    if len(results) == limit:
+                        break
+        if len(results) < limit and len(name) >= 3:
+            for score, pos in self._fuzzy(name, limit):
+                if score < self.FUZZY_THRESHOLD / 2:
+                    break
+                if pos not in results:
+                    results.append(pos)
+                    if len(results) == limit:
+                        break
+        return results
@@ -0,0 +1,153 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def cache_key(endpoint, params):
+    """Stable cache key for an endpoint and its query parameters"""
+    items = sorted((k, str(v)) for k, v in (params or {}).items() if k != "api_key")
+    return endpoint + "?" + "&".join(f"{k}={v}" for k, v in items)
+
+
+def ttl_for(endpoint, ttls):
+    """TTL (seconds) of the first matching endpoint prefix, or 0 to skip caching"""
+    for prefix, ttl in ttls:
+        if endpoint.startswith(prefix):
+            return ttl
+    return 0
+
+
+class ResponseCache:
+    """TTL cache for TMDB responses.
+
+    A bounded in-memory LRU tier sits in front of an optional SQLite tier
+    that survives restarts. Entries stay readable as stale copies for
+    `stale_ttl` seconds after they expire, so callers can serve the last
+    good payload while a refresh runs. Dead disk rows are purged every
+    `purge_every` writes rather than on each one.
+    """
+
+    def __init__(self, max_entries=1024, disk_path=None, stale_ttl=0, purge_every=100):
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self.stale_ttl = stale_ttl
+        self.purge_every = purge_every
+        self._writes = 0
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+        if disk_path:
+            os.makedirs(os.path.dirname(os.path.abspath(disk_path)), exist_ok=True)
+            with self._disk() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses "
+                    "(key TEXT PRIMARY KEY, expires_at REAL NOT NULL, payload TEXT NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS responses_expires_at ON responses (expires_at)")
+
+    def reset_connections(self):
+        """Forget disk-tier connections inherited from a parent process after fork"""
+        self._local = threading.local()
+
+    def _disk(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.disk_path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _remember(self, key, expires_at, value):
+        # Caller holds the lock
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def lookup(self, key):
+        """Return (value, fresh) for `key`.
+
+        `fresh` is False for a stale copy that expired less than `stale_ttl`
+        seconds ago; (None, False) means there is nothing usable.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] + self.stale_ttl > now:
+                    self._entries.move_to_end(key)
+                    return entry[1], self._count_hit(entry[0] > now)
+                del self._entries[key]
+
+        if self.disk_path:
+            row = self._disk().execute(
+                "SELECT expires_at, payload FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[0] + self.stale_ttl > now:
+                value = json.loads(row[1])
+                with self._lock:
+                    self._remember(key, row[0], value)
+                    self.disk_hits += 1
+                    return value, self._count_hit(row[0] > now)
+
+        with self._lock:
+            self.misses += 1
+        return None, False
+
+    def _count_hit(self, fresh):
+        # Caller holds the lock
+        self.hits += 1
+        if not fresh:
+            self.stale_hits += 1
+        return fresh
+
+    def get(self, key):
+        """Return the cached value for `key`, or None if missing or expired"""
+        value, fresh = self.lookup(key)
+        return value if fresh else None
+
+    def set(self, key, value, ttl):
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._remember(key, expires_at, value)
+            self._writes += 1
+            purge = self._writes % self.purge_every == 0
+        if self.disk_path:
+            with self._disk() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, expires_at, payload) VALUES (?, ?, ?)",
+                    (key, expires_at, json.dumps(value)),
+                )
+                if purge:
+                    conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time() - self.stale_ttl,))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.disk_path:
+            with self._disk() as conn:
+                conn.execute("DELETE FROM responses")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_hits": self.disk_hits,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "disk_enabled": bool(self.disk_path),
+            }
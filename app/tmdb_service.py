@@ -1,50 +1,233 @@
+import re
 import requests
 import time
-from config import TMDB_API_KEY, TMDB_BASE_URL, TMDB_IMAGE_BASE_URL
+from concurrent.futures import ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
+from config import (
+    TMDB_API_KEY, TMDB_BASE_URL, TMDB_IMAGE_BASE_URL,
+    TMDB_CACHE_TTLS, TMDB_CACHE_MAX_ENTRIES, TMDB_CACHE_DISK_PATH, TMDB_CACHE_STALE_TTL,
+    TMDB_POOL_SIZE, TMDB_MAX_WORKERS, TMDB_BATCH_DEADLINE,
+    TMDB_RATE_LIMIT, TMDB_RATE_BURST, TMDB_RATE_RESERVE, TMDB_INTERACTIVE_MAX_WAIT, TMDB_BACKGROUND_MAX_WAIT,
+    TMDB_RATE_STATE_PATH, SERVER_WORKERS, PRELOADED,
+)
+from metrics import TMDB_REQUEST_SECONDS, TMDB_RETRIES, TMDB_RATE_WAIT_SECONDS, TMDB_RATE_LIMITED
+from rate_limiter import BACKGROUND, INTERACTIVE, PRIORITY_NAMES, PriorityRateLimiter, retry_after_seconds
+from singleflight import SingleFlight
+from tmdb_cache import ResponseCache, cache_key, ttl_for
+
+def endpoint_label(endpoint):
+    """Endpoint with ids replaced, to keep metric label cardinality bounded"""
+    return re.sub(r"/\d+", "/{id}", endpoint)
 
 class TMDBService:
-    def __init__(self):
+    def __init__(self, cache=None, pool_size=TMDB_POOL_SIZE, max_workers=TMDB_MAX_WORKERS):
         self.api_key = TMDB_API_KEY
         self.base_url = TMDB_BASE_URL
         self.image_base_url = TMDB_IMAGE_BASE_URL
-        
-    def _make_request(self, endpoint, params=None):
-        """Make a request to TMDB API with timeout and retry logic"""
-        if params is None:
-            params = {}
+        self.cache = cache or ResponseCache(TMDB_CACHE_MAX_ENTRIES, TMDB_CACHE_DISK_PATH, TMDB_CACHE_STALE_TTL)
+        self.pool_size = pool_size
+        self.max_workers = max_workers
+        # Share of the TMDB quota this process may use when the rate limiter
+        # cannot share its bucket with the other processes on the host
+        self.rate_share = 1.0 / SERVER_WORKERS if PRELOADED else 1.0
+        self._start_pools()
+
+    def _start_pools(self):
+        self.inflight = SingleFlight()
+        # One keep-alive session so calls reuse TCP/TLS connections
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tmdb")
+        # Background batches get their own threads so they never queue ahead of user requests
+        self.background_executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tmdb-bg")
+        self.refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tmdb-refresh")
+        self.limiter = self._new_limiter()
+
+    def _new_limiter(self):
+        return PriorityRateLimiter(TMDB_RATE_LIMIT, TMDB_RATE_BURST, TMDB_RATE_RESERVE,
+                                   shared_path=TMDB_RATE_STATE_PATH, fallback_rate=TMDB_RATE_LIMIT * self.rate_share)
+
+    def set_rate_share(self, share):
+        """Limit this process to `share` of the quota whenever the bucket is not shared"""
+        self.rate_share = share
+        self.limiter = self._new_limiter()
+
+    def after_fork(self):
+        """Give a forked worker its own sockets, threads and cache connections"""
+        self._start_pools()
+        self.cache.reset_connections()
+
+    def _make_request(self, endpoint, params=None, priority=INTERACTIVE, deadline=None):
+        """Make a cached request to TMDB API.
+
+        Identical concurrent requests of the same priority share one upstream
+        call. A stale cached copy is returned immediately while a single
+        background refresh runs, so a slow TMDB never blocks a request that
+        has something to serve. `deadline` (a time.monotonic() value) bounds
+        how long the call may queue for a rate-limit token.
+        """
+        ttl = ttl_for(endpoint, TMDB_CACHE_TTLS)
+        if not ttl:
+            return self._fetch(endpoint, params, priority, deadline)
+        key = cache_key(endpoint, params)
+        data, fresh = self.cache.lookup(key)
+        if data is not None:
+            if not fresh:
+                self.inflight.submit((BACKGROUND, key), self.refresh_executor, self._fetch_and_cache,
+                                     key, endpoint, params, ttl, BACKGROUND, None)
+            return data
+        return self.inflight.do((priority, key), self._fetch_and_cache, key, endpoint, params, ttl, priority, deadline)
+
+    def _fetch_and_cache(self, key, endpoint, params, ttl, priority=INTERACTIVE, deadline=None):
+        data = self._fetch(endpoint, params, priority, deadline)
+        if data is not None:
+            self.cache.set(key, data, ttl)
+        return data
+
+    def _wait_for_token(self, priority, deadline, label):
+        if deadline is None:
+            deadline = time.monotonic() + (TMDB_INTERACTIVE_MAX_WAIT if priority == INTERACTIVE
+                                           else TMDB_BACKGROUND_MAX_WAIT)
+        started = time.perf_counter()
+        granted = self.limiter.acquire(priority, deadline)
+        TMDB_RATE_WAIT_SECONDS.observe(time.perf_counter() - started, priority=PRIORITY_NAMES[priority])
+        if not granted:
+            TMDB_RATE_LIMITED.inc(priority=PRIORITY_NAMES[priority], reason="deadline")
+            print(f"TMDB rate limit: gave up waiting for a slot for endpoint: {label}")
+        return granted
+
+    def _apply_backpressure(self, response, priority, attempt):
+        """Pause the rate limiter as TMDB asks; returns True for a 429"""
+        if response.status_code == 429:
+            wait = retry_after_seconds(response.headers.get("Retry-After"))
+            self.limiter.pause(wait if wait is not None else 2 ** attempt)
+            TMDB_RATE_LIMITED.inc(priority=PRIORITY_NAMES[priority], reason="429")
+            return True
+        # Older TMDB responses advertise the remaining quota instead
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            reset = response.headers.get("X-RateLimit-Reset")
+            if reset and reset.isdigit():
+                self.limiter.pause(max(0.0, int(reset) - time.time()))
+        return False
+
+    @staticmethod
+    def _timeout(deadline, connect=5, read=15):
+        """(connect, read) timeouts for one attempt, clamped to the time left; None if none is left"""
+        if deadline is None:
+            return (connect, read)
+        left = deadline - time.monotonic()
+        if left <= 0:
+            return None
+        return (min(connect, left), min(read, left))
+
+    @staticmethod
+    def _backoff(attempt, deadline):
+        """Sleep before a retry (exponential backoff); False if the retry would miss the deadline"""
+        delay = 2 ** attempt
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return False
+        time.sleep(delay)
+        return True
+
+    def _fetch(self, endpoint, params=None, priority=INTERACTIVE, deadline=None):
+        """Make a request to TMDB API with rate limiting, timeout and retry logic.
+
+        With a `deadline` (a time.monotonic() value) every attempt's timeouts
+        are clamped to the time left, and a retry or backoff that would run
+        past it is skipped, so abandoned batch work frees its worker on time.
+        """
+        params = dict(params or {})
         params['api_key'] = self.api_key
         
         url = f"{self.base_url}/{endpoint}"
+        label = endpoint_label(endpoint)
         
         # Retry logic with exponential backoff
         max_retries = 3
         for attempt in range(max_retries):
+            if deadline is not None and time.monotonic() >= deadline:
+                print(f"TMDB API deadline passed before attempt {attempt + 1} for endpoint: {endpoint}")
+                return None
+            if not self._wait_for_token(priority, deadline, label):
+                return None
+            timeout = self._timeout(deadline)
+            if timeout is None:
+                return None
+            started = time.perf_counter()
             try:
-                response = requests.get(
+                response = self.session.get(
                     url, 
                     params=params, 
-                    timeout=(5, 15)  # (connect timeout, read timeout)
+                    timeout=timeout  # (connect timeout, read timeout)
                 )
+                if self._apply_backpressure(response, priority, attempt):
+                    TMDB_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=label, outcome="rate_limited")
+                    if attempt == max_retries - 1:
+                        print(f"TMDB API rate limited after {max_retries} attempts for endpoint: {endpoint}")
+                        return None
+                    print(f"TMDB API rate limited, retrying... (attempt {attempt + 1}/{max_retries})")
+                    TMDB_RETRIES.inc(endpoint=label)
+                    continue  # the limiter holds the retry back for Retry-After
                 response.raise_for_status()
-                return response.json()
+                data = response.json()
+                TMDB_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=label, outcome="ok")
+                return data
             except requests.exceptions.Timeout:
+                TMDB_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=label, outcome="timeout")
                 if attempt == max_retries - 1:
                     print(f"TMDB API timeout after {max_retries} attempts for endpoint: {endpoint}")
                     return None
                 print(f"TMDB API timeout, retrying... (attempt {attempt + 1}/{max_retries})")
-                time.sleep(2 ** attempt)  # Exponential backoff
+                TMDB_RETRIES.inc(endpoint=label)
+                if not self._backoff(attempt, deadline):
+                    return None
             except requests.exceptions.ConnectionError:
+                TMDB_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=label, outcome="connection_error")
                 if attempt == max_retries - 1:
                     print(f"TMDB API connection error after {max_retries} attempts for endpoint: {endpoint}")
                     return None
                 print(f"TMDB API connection error, retrying... (attempt {attempt + 1}/{max_retries})")
-                time.sleep(2 ** attempt)
-            except requests.RequestException as e:
+                TMDB_RETRIES.inc(endpoint=label)
+                if not self._backoff(attempt, deadline):
+                    return None
+            except (requests.RequestException, ValueError) as e:
+                TMDB_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=label, outcome="error")
                 print(f"Error making request to TMDB: {e}")
                 return None
         
         return None
     
+    def fetch_many(self, requests_list, deadline=TMDB_BATCH_DEADLINE, priority=INTERACTIVE):
+        """Run independent requests concurrently on the worker pool.
+
+        `requests_list` holds endpoints or (endpoint, params) tuples. Results
+        come back in the same order; a request that failed or did not finish
+        within `deadline` seconds yields None. Background batches (warmers,
+        backfills) run on their own threads at background priority.
+        """
+        executor = self.executor if priority == INTERACTIVE else self.background_executor
+        expires = time.monotonic() + deadline
+        futures = []
+        for item in requests_list:
+            endpoint, params = item if isinstance(item, tuple) else (item, None)
+            futures.append(executor.submit(self._make_request, endpoint, params, priority, expires))
+        wait(futures, timeout=deadline)
+        results = []
+        for future in futures:
+            if future.done() and not future.exception():
+                results.append(future.result())
+            else:
+                future.cancel()
+                results.append(None)
+        return results
+    
+    def get_movie_details_many(self, movie_ids, priority=INTERACTIVE, deadline=TMDB_BATCH_DEADLINE):
+        """Get details for several movies concurrently, as {id: details}"""
+        results = self.fetch_many([f"movie/{movie_id}" for movie_id in movie_ids], deadline, priority)
+        return {movie_id: details for movie_id, details in zip(movie_ids, results) if details}
+    
     def search_movies(self, query, page=1):
         """Search for movies by title"""
         endpoint = "search/movie"
@@ -72,6 +255,14 @@ class TMDBService:
         endpoint = f"trending/tv/{time_window}"
         return self._make_request(endpoint)
     
+    def get_cache_stats(self):
+        """Hit/miss/eviction counters of the response cache"""
+        return self.cache.stats()
+
+    def get_rate_limit_stats(self):
+        """Token bucket state and per-priority grant/expiry counters"""
+        return self.limiter.stats()
+    
     def get_poster_url(self, poster_path, size="w500"):
         """Get full URL for movie poster"""
         if not poster_path:
@@ -0,0 +1,108 @@
+"""Fill the local TMDB metadata store for every movie in the catalog.
+
+Usage:
+    python warm_metadata.py [--max-age SECONDS] [--limit N]
+
+Only movies that are missing or older than --max-age are fetched, so the
+command can be re-run (or scheduled) cheaply. The server also runs the
+same refresh in a background thread every METADATA_REFRESH_INTERVAL seconds.
+
+Fetches run at background priority against the host-wide TMDB rate limit
+shared with the server, so a warm-up uses the quota users leave free. If
+that shared state is disabled, the command keeps to TMDB_WARMER_RATE_SHARE
+of the rate.
+"""
+import argparse
+import os
+import threading
+from config import (
+    MOVIES_CSV_PATH, CREDITS_CSV_PATH, MODEL_DIR, MODEL_TOP_K, NEIGHBOR_BACKEND, NEIGHBOR_OPTIONS,
+    METADATA_DB_PATH, METADATA_MAX_AGE, METADATA_REFRESH_BATCH, TMDB_BACKGROUND_MAX_WAIT,
+    TMDB_WARMER_RATE_SHARE,
+)
+from metadata_store import MetadataStore
+from rate_limiter import BACKGROUND
+from tmdb_service import tmdb_service
+
+
+def warm_metadata(store, movie_ids, max_age, limit=None, batch_size=50):
+    """Fetch details for stale or missing ids and store them. Returns the count stored.
+
+    Fetches run at background priority, so they use whatever TMDB rate the
+    server's user requests leave free.
+    """
+    stale = store.stale_ids(movie_ids, max_age)
+    if limit is not None:
+        stale = stale[:limit]
+    stored = 0
+    for start in range(0, len(stale), batch_size):
+        fetched = tmdb_service.get_movie_details_many(
+            stale[start:start + batch_size], priority=BACKGROUND, deadline=TMDB_BACKGROUND_MAX_WAIT,
+        )
+        stored += store.upsert_many(fetched.values())
+    return stored
+
+
+def claim_refresher(lock_path):
+    """Take the per-host refresher lock; returns the held file or None.
+
+    With several server worker processes only the one holding the lock runs
+    the refresher. The lock is released when that process exits, so a
+    replacement worker picks the job up. Platforms without fcntl always win.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        return open(os.devnull)
+    handle = open(lock_path, "a")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+
+class MetadataRefresher(threading.Thread):
+    """Daemon thread that keeps the metadata store fresh on a schedule"""
+
+    def __init__(self, store, movie_ids, interval, max_age=METADATA_MAX_AGE, limit=METADATA_REFRESH_BATCH):
+        super().__init__(name="metadata-refresher", daemon=True)
+        self.store = store
+        self.movie_ids = list(movie_ids)
+        self.interval = interval
+        self.max_age = max_age
+        self.limit = limit  # movies refreshed per run
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                stored = warm_metadata(self.store, self.movie_ids, self.max_age, limit=self.limit)
+                if stored:
+                    print(f"Refreshed TMDB metadata for {stored} movies")
+            except Exception as e:
+                print(f"Error refreshing TMDB metadata: {e}")
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm the local TMDB metadata store")
+    parser.add_argument("--db", default=METADATA_DB_PATH, help="path to the metadata SQLite file")
+    parser.add_argument("--max-age", type=int, default=METADATA_MAX_AGE, help="refetch entries older than this (seconds)")
+    parser.add_argument("--limit", type=int, default=None, help="fetch at most this many movies")
+    args = parser.parse_args()
+
+    tmdb_service.set_rate_share(TMDB_WARMER_RATE_SHARE)
+    from model_store import load_or_build
+    model = load_or_build(MOVIES_CSV_PATH, CREDITS_CSV_PATH, MODEL_DIR, MODEL_TOP_K, NEIGHBOR_BACKEND, NEIGHBOR_OPTIONS)
+    store = MetadataStore(args.db)
+    stored = warm_metadata(store, model.catalog.ids.tolist(), args.max_age, args.limit)
+    print(f"Stored metadata for {stored} movies ({store.count()} in store)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""WSGI entry point for serving Cinematch with several worker processes.
+
+Usage:
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+With `preload_app` (the default in gunicorn.conf.py) the master process
+imports this module once: the model artifact is opened, the catalog is
+memory-mapped and the title/genre indexes are built before any worker is
+forked. Workers then share those pages read-only, so each additional worker
+only costs its per-request working set. Per-process resources are recreated
+in every worker by the `post_worker_init` hook.
+"""
+import gc
+import os
+
+os.environ.setdefault("CINEMATCH_PRELOAD", "1")
+
+from app import app  # noqa: E402
+
+# Move everything allocated so far out of the garbage collector's view, so
+# collections in the workers do not write to (and so un-share) these pages
+gc.collect()
+gc.freeze()
@@ -0,0 +1,42 @@
+"""Compare two benchmark result files.
+
+Usage:
+    python compare.py baseline.json candidate.json
+"""
+import argparse
+import json
+
+TOP_LEVEL = ["build_seconds", "cold_start_seconds", "startup_rss_mib", "recall_at_k"]
+PER_SCENARIO = ["p50_ms", "p95_ms", "p99_ms", "throughput_rps", "peak_rss_mib"]
+
+
+def _delta(old, new):
+    if old in (None, 0) or new is None:
+        return ""
+    return f"{(new - old) / old * 100:+.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark runs")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+    with open(args.baseline, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        new = json.load(f)
+
+    print(f"baseline  {old.get('commit')}\ncandidate {new.get('commit')}\n")
+    for key in TOP_LEVEL:
+        print(f"{key:28s} {old.get(key)!s:>12.12} -> {new.get(key)!s:>12.12} {_delta(old.get(key), new.get(key))}")
+    for name in sorted(set(old.get("scenarios", {})) | set(new.get("scenarios", {}))):
+        before = old.get("scenarios", {}).get(name, {})
+        after = new.get("scenarios", {}).get(name, {})
+        print(f"\n{name}")
+        for key in PER_SCENARIO:
+            a, b = before.get(key), after.get(key)
+            print(f"  {key:26s} {a!s:>12.12} -> {b!s:>12.12} {_delta(a, b)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Local stand-in for the TMDB API.
+
+Usage:
+    python fake_tmdb.py [--port 8765] [--fixtures FILE] [--latency-ms 50] [--failure-rate 0.01]
+                        [--rate-limit 40]
+
+Replays recorded responses from a fixtures JSON file ({"<path>": payload},
+e.g. {"movie/popular": {...}}) and synthesises plausible payloads for any
+other path. Latency, jitter, HTTP 5xx failures and stalled responses can be
+injected so benchmarks never depend on the live API. With --rate-limit,
+requests beyond that many per second get a 429 with a Retry-After header,
+like the real API. GET /__stats returns per-path request counts.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+_MOVIE_PATH = re.compile(r"^movie/(\d+)$")
+
+
+def _movie(movie_id):
+    return {
+        "id": movie_id,
+        "title": f"Movie {movie_id}",
+        "original_title": f"Movie {movie_id}",
+        "overview": "A synthetic movie returned by the local TMDB stand-in. " * 3,
+        "poster_path": f"/poster{movie_id}.jpg",
+        "backdrop_path": f"/backdrop{movie_id}.jpg",
+        "release_date": "2001-01-01",
+        "vote_average": 6.5,
+        "vote_count": 1200,
+        "popularity": 10.0,
+        "runtime": 110,
+        "genres": [{"id": 18, "name": "Drama"}],
+        "budget": 1000000,
+        "revenue": 5000000,
+    }
+
+
+def _tv(show_id):
+    movie = _movie(show_id)
+    movie["name"] = movie.pop("title")
+    return movie
+
+
+def synthesize(path):
+    """Plausible payload for a TMDB path that has no recorded fixture"""
+    match = _MOVIE_PATH.match(path)
+    if match:
+        return _movie(int(match.group(1)))
+    make = _tv if path.startswith("trending/tv") else _movie
+    base = zlib.crc32(path.encode()) % 100000
+    return {"page": 1, "results": [make(base + i) for i in range(20)], "total_pages": 1, "total_results": 20}
+
+
+class FakeTMDB:
+    def __init__(self, fixtures=None, latency_ms=0, jitter_ms=0, failure_rate=0.0,
+                 stall_rate=0.0, stall_seconds=20.0, seed=None, rate_limit=0):
+        self.fixtures = fixtures or {}
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self.rate_limit = rate_limit
+        self._window = (0, 0)  # (second, requests served in it)
+        self.random = random.Random(seed)
+        self.counts = Counter()
+        self._lock = threading.Lock()
+        self.server = None
+
+    def _over_limit(self):
+        second = int(time.time())
+        window, served = self._window
+        served = served + 1 if window == second else 1
+        self._window = (second, served)
+        return self.rate_limit and served > self.rate_limit
+
+    def handle(self, path):
+        """Return (status, payload) for an API path, applying injected faults"""
+        with self._lock:
+            self.counts[path] += 1
+            if self._over_limit():
+                self.counts["__429"] += 1
+                return 429, {"status_code": 25, "status_message": "Request count over limit"}
+            roll = self.random.random()
+            delay = (self.latency_ms + self.random.uniform(0, self.jitter_ms)) / 1000.0
+        if roll < self.stall_rate:
+            time.sleep(self.stall_seconds)
+        elif delay:
+            time.sleep(delay)
+        if self.stall_rate <= roll < self.stall_rate + self.failure_rate:
+            return 503, {"status_code": 503, "status_message": "Injected failure"}
+        if path in self.fixtures:
+            return 200, self.fixtures[path]
+        return 200, synthesize(path)
+
+    def start(self, host="127.0.0.1", port=0):
+        """Serve on a background thread; returns the base URL"""
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                path = urlsplit(self.path).path.strip("/")
+                if path.startswith("3/"):
+                    path = path[2:]
+                if path == "__stats":
+                    status, payload = 200, dict(fake.counts)
+                else:
+                    status, payload = fake.handle(path)
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                if status == 429:
+                    self.send_header("Retry-After", "1")
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self.server.server_address[1]}/3"
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local TMDB stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", help="JSON file of recorded responses keyed by API path")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=0, help="requests per second before 429s (0: unlimited)")
+    args = parser.parse_args()
+
+    fixtures = None
+    if args.fixtures:
+        with open(args.fixtures, encoding="utf-8") as f:
+            fixtures = json.load(f)
+    fake = FakeTMDB(fixtures, args.latency_ms, args.jitter_ms, args.failure_rate, args.stall_rate,
+                    rate_limit=args.rate_limit)
+    url = fake.start(args.host, args.port)
+    print(f"Fake TMDB listening on {url} (set CINEMATCH_TMDB_BASE_URL={url})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
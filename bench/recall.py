@@ -0,0 +1,94 @@
+"""Measure recall@K of the approximate neighbour backend against exact search.
+
+Usage:
+    python recall.py --model-dir DIR [--k 10] [--samples 500]
+                     [--terms 4,8,16] [--candidates 100,200,400] [--json]
+
+Opens a built artifact and samples seed movies. For every terms/candidates
+setting it reports the mean fraction of the exact top-K (brute-force
+cosine over the sparse vectors) that the inverted-index backend also
+returns, plus the per-query latency of both. If the artifact was not built
+with the inverted backend its index is built in memory.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app")
+sys.path.insert(0, APP_DIR)
+
+from model_store import ModelArtifact  # noqa: E402
+from neighbors import InvertedNeighbors, SparseNeighbors, build_postings  # noqa: E402
+
+
+def _timed_queries(neighbors, seeds, k):
+    results = []
+    started = time.perf_counter()
+    for idx in seeds:
+        results.append(neighbors.query(int(idx), k)[0])
+    return results, (time.perf_counter() - started) * 1000.0 / max(len(seeds), 1)
+
+
+def measure_recall(model_dir, k=10, samples=500, terms=(4, 8, 16), candidates=(100, 200, 400), seed=42):
+    model = ModelArtifact.open(model_dir)
+    n = model.manifest["n_movies"]
+    seeds = np.random.default_rng(seed).choice(n, size=min(samples, n), replace=False)
+    exact, exact_ms = _timed_queries(SparseNeighbors(model.vectors), seeds, k)
+
+    if isinstance(model.neighbors, InvertedNeighbors):
+        index = model.neighbors
+        build_seconds = model.manifest.get("stage_seconds", {}).get("neighbor_index")
+    else:
+        started = time.perf_counter()
+        index = InvertedNeighbors(model.vectors, build_postings(model.vectors))
+        build_seconds = time.perf_counter() - started
+
+    settings = []
+    for term_count in terms:
+        for candidate_count in candidates:
+            index.terms, index.candidates = term_count, candidate_count
+            approx, approx_ms = _timed_queries(index, seeds, k)
+            recall = np.mean([len(np.intersect1d(a, e)) / max(len(e), 1) for a, e in zip(approx, exact)])
+            settings.append({
+                "terms": term_count,
+                "candidates": candidate_count,
+                "recall_at_k": float(recall),
+                "approx_ms": approx_ms,
+            })
+    return {
+        "k": k,
+        "samples": len(seeds),
+        "n_movies": n,
+        "index_build_seconds": build_seconds,
+        "exact_ms": exact_ms,
+        "settings": settings,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="recall@K of approximate neighbours against exact search")
+    parser.add_argument("--model-dir", required=True)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--terms", default="4,8,16", help="comma-separated seed term counts to try")
+    parser.add_argument("--candidates", default="100,200,400", help="comma-separated shortlist sizes to try")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = measure_recall(args.model_dir, args.k, args.samples,
+                            [int(t) for t in args.terms.split(",")], [int(c) for c in args.candidates.split(",")])
+    if args.json:
+        print(json.dumps(report))
+        return
+    print(f"{report['n_movies']} movies, exact {report['exact_ms']:.2f}ms/query")
+    for row in report["settings"]:
+        print(f"  terms {row['terms']:3d}  candidates {row['candidates']:5d}  "
+              f"recall@{args.k} {row['recall_at_k']:.3f}  {row['approx_ms']:.2f}ms/query")
+
+
+if __name__ == "__main__":
+    main()
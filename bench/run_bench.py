@@ -0,0 +1,289 @@
+"""Reproducible end-to-end benchmark for the Cinematch server.
+
+Usage:
+    python run_bench.py [--rows 5000] [--concurrency 8] [--requests 400]
+                        [--latency-ms 40] [--failure-rate 0] [--backend exact|inverted]
+                        [--output results.json]
+
+Generates a synthetic catalog, starts a local TMDB stand-in, builds the
+model, starts the server in a subprocess and then drives each endpoint at a
+fixed concurrency. Reports model build time, server cold start, per-endpoint
+p50/p95/p99 latency and throughput, and the server's RSS / peak RSS after
+each scenario, plus recall@K of the approximate neighbour backend against
+exact search (see recall.py). Results are written as JSON; compare two runs with
+`python compare.py old.json new.json`.
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+APP_DIR = os.path.join(ROOT_DIR, "app")
+sys.path.insert(0, BENCH_DIR)
+
+from fake_tmdb import FakeTMDB  # noqa: E402
+from synth_catalog import generate  # noqa: E402
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def read_rss(pid):
+    """(current RSS, peak RSS) of a process in MiB, from /proc (Linux only)"""
+    values = {}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith(("VmRSS:", "VmHWM:")):
+                    key, amount = line.split(":", 1)
+                    values[key] = int(amount.split()[0]) / 1024.0
+    except OSError:
+        return None, None
+    return values.get("VmRSS"), values.get("VmHWM")
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Client:
+    """One keep-alive HTTP connection per worker thread"""
+
+    def __init__(self, port):
+        self.port = port
+        self._local = threading.local()
+
+    def request(self, method, path, body=None):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=60)
+        headers = {"Accept": "application/json"}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        try:
+            conn.request(method, path, payload, headers)
+            response = conn.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            self._local.conn = None
+            return 0
+
+
+def run_scenario(client, make_request, total, concurrency):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def one(_):
+        method, path, body = make_request()
+        started = time.perf_counter()
+        status = client.request(method, path, body)
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed * 1000.0)
+            if status >= 400 or status == 0:
+                errors[0] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    wall = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors[0],
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "mean_ms": sum(latencies) / len(latencies) if latencies else None,
+        "throughput_rps": total / wall if wall else None,
+    }
+
+
+def wait_for_server(port, process, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with code {process.returncode}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/catalog")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.01)
+    raise RuntimeError("server did not become ready in time")
+
+
+def scenarios(ids, titles, moods, rng):
+    def pick_title_prefix():
+        title = rng.choice(titles)
+        return title[:max(2, len(title) // 2)]
+
+    return {
+        "catalog": lambda: ("GET", "/catalog", None),
+        "autocomplete": lambda: ("GET", "/autocomplete?q=" + pick_title_prefix().replace(" ", "%20"), None),
+        "recommend_movie": lambda: ("POST", "/recommend", {"mode": "movie", "movie_id": rng.choice(ids)}),
+        "recommend_title": lambda: ("POST", "/recommend", {"mode": "movie", "movie_name": rng.choice(titles)}),
+        "recommend_mood": lambda: ("POST", "/recommend", {"mode": "mood", "mood": rng.choice(moods)}),
+        "recommend_batch": lambda: ("POST", "/recommend/batch", {
+            "seeds": rng.sample(ids, 20),
+            "histories": {f"user-{u}": rng.sample(ids, 10) for u in range(10)},
+        }),
+        "recommend_text": lambda: ("POST", "/recommend/text",
+                                   {"text": " ".join(rng.sample(titles, 3)).lower(), "genres": ["Drama"]}),
+        "trending": lambda: ("GET", "/trending", None),
+        "popular": lambda: ("GET", "/popular", None),
+        "movie_details": lambda: ("GET", f"/movie/{rng.choice(ids)}", None),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Cinematch server")
+    parser.add_argument("--rows", type=int, default=5000, help="synthetic catalog size")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=400, help="requests per scenario")
+    parser.add_argument("--latency-ms", type=float, default=40, help="injected TMDB latency")
+    parser.add_argument("--jitter-ms", type=float, default=20)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of TMDB calls answering 503")
+    parser.add_argument("--fixtures", help="recorded TMDB responses to replay (JSON keyed by API path)")
+    parser.add_argument("--backend", default="exact", choices=["exact", "inverted"], help="neighbour backend")
+    parser.add_argument("--neighbor-terms", type=int, default=16, help="inverted backend: seed terms looked up")
+    parser.add_argument("--neighbor-candidates", type=int, default=200, help="inverted backend: shortlist size")
+    parser.add_argument("--recall-samples", type=int, default=200, help="seed movies for recall@K (0 skips it)")
+    parser.add_argument("--only", help="comma-separated scenario names to run")
+    parser.add_argument("--workdir", help="reuse a directory for the catalog and model (default: temp dir)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=os.path.join(BENCH_DIR, "results.json"))
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="cinematch-bench-")
+    data_dir = os.path.join(workdir, f"data-{args.rows}")
+    started = time.perf_counter()
+    ids, titles = generate(args.rows, data_dir, args.seed)
+    generate_seconds = time.perf_counter() - started
+    print(f"Generated {args.rows} movies in {generate_seconds:.1f}s ({data_dir})")
+
+    fixtures = None
+    if args.fixtures:
+        with open(args.fixtures, encoding="utf-8") as f:
+            fixtures = json.load(f)
+    fake = FakeTMDB(fixtures, args.latency_ms, args.jitter_ms, args.failure_rate, seed=args.seed)
+    tmdb_url = fake.start()
+
+    env = dict(os.environ)
+    env.update({
+        "CINEMATCH_MOVIES_CSV": os.path.join(data_dir, "tmdb_5000_movies.csv"),
+        "CINEMATCH_CREDITS_CSV": os.path.join(data_dir, "tmdb_5000_credits.csv"),
+        "CINEMATCH_MODEL_DIR": os.path.join(workdir, f"model-{args.rows}"),
+        "CINEMATCH_TMDB_BASE_URL": tmdb_url,
+        "CINEMATCH_METADATA_REFRESH_INTERVAL": "0",
+        "CINEMATCH_NEIGHBOR_BACKEND": args.backend,
+        "CINEMATCH_NEIGHBOR_TERMS": str(args.neighbor_terms),
+        "CINEMATCH_NEIGHBOR_CANDIDATES": str(args.neighbor_candidates),
+    })
+
+    started = time.perf_counter()
+    build = subprocess.run([sys.executable, "build_model.py", "--force"], cwd=APP_DIR, env=env,
+                           capture_output=True, text=True)
+    build_seconds = time.perf_counter() - started
+    if build.returncode != 0:
+        sys.exit(f"Model build failed:\n{build.stdout}\n{build.stderr}")
+    print(f"Built model in {build_seconds:.1f}s")
+
+    recall = None
+    if args.recall_samples:
+        measured = subprocess.run(
+            [sys.executable, os.path.join(BENCH_DIR, "recall.py"), "--model-dir", env["CINEMATCH_MODEL_DIR"],
+             "--samples", str(args.recall_samples), "--terms", str(args.neighbor_terms),
+             "--candidates", str(args.neighbor_candidates), "--json"],
+            cwd=APP_DIR, env=env, capture_output=True, text=True,
+        )
+        if measured.returncode != 0:
+            sys.exit(f"Recall measurement failed:\n{measured.stderr}")
+        recall = json.loads(measured.stdout.strip().splitlines()[-1])
+        setting = recall["settings"][0]
+        print(f"recall@{recall['k']} {setting['recall_at_k']:.3f} "
+              f"({setting['approx_ms']:.2f}ms vs exact {recall['exact_ms']:.2f}ms per query)")
+
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, os.path.join(BENCH_DIR, "serve.py"), "--port", str(port)],
+                              cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    results = {}
+    try:
+        wait_for_server(port, server, timeout=600)
+        cold_start_seconds = time.perf_counter() - started
+        rss, peak = read_rss(server.pid)
+        print(f"Server ready in {cold_start_seconds:.2f}s (RSS {rss} MiB)")
+
+        rng = random.Random(args.seed)
+        moods = ["happy", "sad", "excited", "relaxed"]
+        selected = scenarios(ids, titles, moods, rng)
+        if args.only:
+            wanted = set(args.only.split(","))
+            selected = {name: make for name, make in selected.items() if name in wanted}
+        client = Client(port)
+        for name, make_request in selected.items():
+            stats = run_scenario(client, make_request, args.requests, args.concurrency)
+            stats["rss_mib"], stats["peak_rss_mib"] = read_rss(server.pid)
+            results[name] = stats
+            print(f"{name:16s} p50 {stats['p50_ms']:8.2f}ms  p95 {stats['p95_ms']:8.2f}ms  "
+                  f"p99 {stats['p99_ms']:8.2f}ms  {stats['throughput_rps']:8.1f} req/s  "
+                  f"errors {stats['errors']}  peak RSS {stats['peak_rss_mib']} MiB")
+    finally:
+        server.terminate()
+        server.wait()
+        fake.stop()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": int(time.time()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": vars(args),
+        "generate_seconds": generate_seconds,
+        "build_seconds": build_seconds,
+        "cold_start_seconds": cold_start_seconds,
+        "startup_rss_mib": rss,
+        "recall_at_k": recall["settings"][0]["recall_at_k"] if recall else None,
+        "recall": recall,
+        "tmdb_upstream_calls": dict(fake.counts),
+        "scenarios": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""Serve the Flask app on a threaded WSGI server for benchmarking.
+
+Usage:
+    python serve.py --port 5055
+
+Configuration comes from the usual CINEMATCH_* environment variables.
+"""
+import argparse
+import os
+import sys
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Cinematch without the debug reloader")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5055)
+    args = parser.parse_args()
+
+    sys.path.insert(0, APP_DIR)
+    os.chdir(APP_DIR)
+    from werkzeug.serving import make_server
+    import app
+
+    make_server(args.host, args.port, app.app, threaded=True).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
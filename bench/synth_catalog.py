@@ -0,0 +1,129 @@
+"""Generate a synthetic TMDB-style catalog of any size.
+
+Usage:
+    python synth_catalog.py --rows 50000 --out /tmp/cinematch-50k
+
+Writes tmdb_5000_movies.csv and tmdb_5000_credits.csv with the same columns
+and JSON cell formats as the real TMDB 5000 export, so the build pipeline
+and server can be benchmarked at 10x or 100x the real catalog size.
+
+Movies belong to topics (a franchise, a director's circle, a subgenre)
+that share overview words, keywords and people, so like the real data
+every movie has a few genuinely similar neighbours rather than only
+random word overlap.
+"""
+import argparse
+import csv
+import json
+import os
+import random
+
+MOVIE_COLUMNS = [
+    "budget", "genres", "homepage", "id", "keywords", "original_language", "original_title",
+    "overview", "popularity", "production_companies", "production_countries", "release_date",
+    "revenue", "runtime", "spoken_languages", "status", "tagline", "title", "vote_average", "vote_count",
+]
+CREDIT_COLUMNS = ["movie_id", "title", "cast", "crew"]
+
+GENRES = [
+    (28, "Action"), (12, "Adventure"), (16, "Animation"), (35, "Comedy"), (80, "Crime"),
+    (99, "Documentary"), (18, "Drama"), (10751, "Family"), (14, "Fantasy"), (36, "History"),
+    (27, "Horror"), (10402, "Music"), (9648, "Mystery"), (10749, "Romance"),
+    (878, "Science Fiction"), (10770, "TV Movie"), (53, "Thriller"), (10752, "War"), (37, "Western"),
+]
+JOBS = ["Director", "Producer", "Screenplay", "Editor", "Original Music Composer",
+        "Director of Photography", "Casting", "Art Direction", "Costume Design", "Sound Designer"]
+SYLLABLES = ["ka", "ro", "mi", "ten", "sha", "lo", "ver", "an", "dor", "el", "is", "qu", "ar", "to", "ne", "ly"]
+
+
+def _word(rng, min_syllables=2, max_syllables=4):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(min_syllables, max_syllables)))
+
+
+def make_vocabulary(rng, size):
+    return sorted({_word(rng) for _ in range(size * 2)})[:size]
+
+
+def _zipf_choice(rng, items, s=1.1):
+    # Cheap Zipf-like pick: low indexes are much more frequent
+    idx = int(len(items) * (rng.random() ** (1 + s)))
+    return items[min(idx, len(items) - 1)]
+
+
+def _name(rng, people):
+    return _zipf_choice(rng, people)
+
+
+def _pick(rng, own, shared, p_own):
+    return rng.choice(own) if rng.random() < p_own else _zipf_choice(rng, shared)
+
+
+def generate(rows, out_dir, seed=42):
+    """Write the two CSVs for `rows` movies and return (ids, titles)"""
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(rng, 20000)
+    people = [f"{_word(rng).title()} {_word(rng).title()}" for _ in range(max(1000, rows // 2))]
+    topics = [
+        {"words": rng.sample(vocabulary, 30), "people": rng.sample(people, 25)}
+        for _ in range(max(20, rows // 25))
+    ]
+    os.makedirs(out_dir, exist_ok=True)
+    movies_path = os.path.join(out_dir, "tmdb_5000_movies.csv")
+    credits_path = os.path.join(out_dir, "tmdb_5000_credits.csv")
+    ids, titles = [], []
+
+    with open(movies_path, "w", newline="", encoding="utf-8") as mf, \
+            open(credits_path, "w", newline="", encoding="utf-8") as cf:
+        movies_writer = csv.writer(mf)
+        credits_writer = csv.writer(cf)
+        movies_writer.writerow(MOVIE_COLUMNS)
+        credits_writer.writerow(CREDIT_COLUMNS)
+        for i in range(rows):
+            movie_id = 10 + i * 3
+            topic = _zipf_choice(rng, topics, s=0.3)
+            title = " ".join(_zipf_choice(rng, vocabulary).title() for _ in range(rng.randint(1, 4)))
+            if rng.random() < 0.1:
+                title += f" {rng.randint(2, 5)}"  # sequels
+            genres = [{"id": g, "name": n} for g, n in rng.sample(GENRES, rng.randint(1, 3))]
+            keywords = [{"id": rng.randint(1, 99999), "name": _pick(rng, topic["words"], vocabulary, 0.6)}
+                        for _ in range(rng.randint(0, 12))]
+            overview = " ".join(_pick(rng, topic["words"], vocabulary, 0.4) for _ in range(rng.randint(15, 60)))
+            vote_count = int(rng.lognormvariate(5, 1.8))
+            vote_average = round(min(10.0, max(0.0, rng.gauss(6.2, 1.0))), 1) if vote_count else 0.0
+            release_date = f"{rng.randint(1916, 2017)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+            movies_writer.writerow([
+                rng.randint(0, 300) * 1_000_000, json.dumps(genres), "", movie_id, json.dumps(keywords),
+                "en", title, overview, round(rng.expovariate(0.05), 6),
+                json.dumps([{"name": _name(rng, people) + " Pictures", "id": rng.randint(1, 9999)}]),
+                json.dumps([{"iso_3166_1": "US", "name": "United States of America"}]),
+                release_date, rng.randint(0, 900) * 1_000_000, rng.randint(70, 180),
+                json.dumps([{"iso_639_1": "en", "name": "English"}]), "Released", "",
+                title, vote_average, vote_count,
+            ])
+            cast = [{"cast_id": k, "character": _word(rng).title(), "credit_id": f"{movie_id:x}{k}",
+                     "gender": rng.randint(0, 2), "id": rng.randint(1, 999999),
+                     "name": _pick(rng, topic["people"], people, 0.3), "order": k}
+                    for k in range(rng.randint(5, 40))]
+            crew = [{"credit_id": f"{movie_id:x}c{k}", "department": "Crew", "gender": rng.randint(0, 2),
+                     "id": rng.randint(1, 999999), "job": "Director" if k == 0 else rng.choice(JOBS),
+                     "name": _pick(rng, topic["people"], people, 0.3)}
+                    for k in range(rng.randint(5, 80))]
+            rng.shuffle(crew)
+            credits_writer.writerow([movie_id, title, json.dumps(cast), json.dumps(crew)])
+            ids.append(movie_id)
+            titles.append(title)
+    return ids, titles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic TMDB-style catalog")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    generate(args.rows, args.out, args.seed)
+    print(f"Wrote {args.rows} movies to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
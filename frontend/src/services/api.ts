@@ -41,6 +41,14 @@ export interface SearchResult {
   query: string;
 }
 
+export interface TextRecommendationRequest {
+  text: string;
+  genres?: string[];
+  year_from?: number;
+  year_to?: number;
+  top_n?: number;
+}
+
 export interface RecommendationRequest {
   movie_id?: number;
   movie_name?: string;
@@ -88,6 +96,14 @@ export const movieApi = {
     });
   },
 
+  // Get local title list and moods (cached by the browser via ETag)
+  getCatalog: async (): Promise<{ version: string; movie_titles: string[]; moods: string[] }> => {
+    return apiRequest(async () => {
+      const response = await api.get('/catalog');
+      return response.data;
+    });
+  },
+
   // Search movies
   searchMovies: async (query: string): Promise<SearchResult> => {
     if (!query.trim()) return { movies: [], query: '' };
@@ -142,6 +158,14 @@ export const movieApi = {
       });
       return response.data.results || [];
     });
+  },
+
+  // Get recommendations for a free-text description
+  getTextRecommendations: async (request: TextRecommendationRequest): Promise<(Movie & { score: number })[]> => {
+    return apiRequest(async () => {
+      const response = await api.post('/recommend/text', request);
+      return response.data.results || [];
+    });
   }
 };
 
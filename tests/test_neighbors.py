@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from scipy import sparse
+from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
+from neighbors import SparseNeighbors, build_postings, select_top_k, top_k_dot
+
+
+@pytest.fixture(scope="module")
+def vectors():
+    rng = np.random.default_rng(7)
+    matrix = sparse.random(40, 25, density=0.25, random_state=rng, format="csr", dtype=np.float32)
+    matrix = matrix + sparse.eye(40, 25, dtype=np.float32, format="csr") * 0.1  # no empty rows
+    return normalize(matrix).astype(np.float32).tocsr()
+
+
+def brute_force(similarity, k):
+    """Best k (indices, scores) per row by a full sort"""
+    order = np.argsort(-similarity, axis=1, kind="stable")[:, :k]
+    return order, np.take_along_axis(similarity, order, axis=1)
+
+
+def test_select_top_k_matches_a_full_sort():
+    scores = np.random.default_rng(1).random((5, 30))
+    assert np.array_equal(select_top_k(scores, 7), np.argsort(-scores, axis=1)[:, :7])
+    assert np.array_equal(select_top_k(scores[0], 50), np.argsort(-scores[0]))
+    assert select_top_k(scores, 0).shape == (5, 0)
+
+
+def test_top_k_dot_excludes_seeds_and_ignores_chunking(vectors):
+    seeds = np.array([0, 3, 17, 39])
+    exclude = sparse.csr_matrix((np.ones(len(seeds)), (np.arange(len(seeds)), seeds)), shape=(len(seeds), 40))
+    similarity = cosine_similarity(vectors[seeds], vectors)
+    similarity[np.arange(len(seeds)), seeds] = -np.inf
+    expected_indices, expected_scores = brute_force(similarity, 6)
+    for chunk_size in (None, 1, 3):
+        indices, scores = top_k_dot(vectors[seeds], build_postings(vectors), 6, exclude=exclude, chunk_size=chunk_size)
+        assert np.array_equal(indices, expected_indices)
+        assert np.allclose(scores, expected_scores, atol=1e-6)
+        assert not np.any(indices == seeds[:, None])
+
+
+def test_query_uses_the_table_then_falls_back_to_an_exact_scan(vectors):
+    similarity = cosine_similarity(vectors)
+    np.fill_diagonal(similarity, -np.inf)
+    expected_indices, expected_scores = brute_force(similarity, 12)
+    table = expected_indices[:, :5].astype(np.int32)
+    neighbors = SparseNeighbors(vectors, table=table, table_scores=np.zeros(table.shape, dtype=np.float32))
+
+    indices, scores = neighbors.query(4, 5)
+    assert np.array_equal(indices, table[4])
+    assert not scores.any()  # answered from the table
+
+    indices, scores = neighbors.query(4, 12)
+    assert np.array_equal(indices, expected_indices[4])
+    assert np.allclose(scores, expected_scores[4], atol=1e-6)
+
+    indices, scores = neighbors.query_many([4, 9], 12)
+    assert np.array_equal(indices, expected_indices[[4, 9]])
+
+
+def test_query_profiles_scores_the_weighted_seed_set(vectors):
+    weights = sparse.csr_matrix(np.array([[2.0, 0, 0, 1.0] + [0] * 36, [0] * 39 + [1.0]]))
+    profiles = weights @ vectors
+    similarity = cosine_similarity(profiles, vectors)
+    similarity[weights.nonzero()] = -np.inf
+    expected_indices, expected_scores = brute_force(similarity, 8)
+    indices, scores = SparseNeighbors(vectors).query_profiles(weights, 8)
+    assert np.array_equal(indices, expected_indices)
+    assert np.allclose(scores, expected_scores, atol=1e-6)
@@ -0,0 +1,257 @@
+import threading
+import time
+from email.utils import format_datetime
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import pytest
+import rate_limiter
+from rate_limiter import BACKGROUND, INTERACTIVE, PriorityRateLimiter, retry_after_seconds
+
+
+class FakeClock:
+    """Manually advanced stand-in for time.monotonic()"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", SimpleNamespace(monotonic=clock, time=clock))
+    return clock
+
+
+def advance(clock, limiter, seconds):
+    """Move the clock forward and wake the limiter's waiters to re-check it"""
+    clock.now += seconds
+    with limiter._cond:
+        limiter._cond.notify_all()
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.001)
+
+
+def start_waiter(limiter, priority, order, deadline=None, label=None):
+    results = []
+
+    def run():
+        granted = limiter.acquire(priority, deadline)
+        results.append(granted)
+        if granted:
+            order.append(priority if label is None else label)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread, results
+
+
+def test_burst_then_empty(clock):
+    limiter = PriorityRateLimiter(rate=1, burst=3)
+    assert all(limiter.acquire(INTERACTIVE, deadline=0) for _ in range(3))
+    assert not limiter.acquire(INTERACTIVE, deadline=0)
+    stats = limiter.stats()
+    assert stats["granted"]["interactive"] == 3
+    assert stats["expired"]["interactive"] == 1
+    assert stats["queued"] == 0
+
+
+def test_tokens_refill_at_rate(clock):
+    limiter = PriorityRateLimiter(rate=2, burst=2)
+    assert limiter.acquire(INTERACTIVE, 0) and limiter.acquire(INTERACTIVE, 0)
+    clock.now = 0.4
+    assert not limiter.acquire(INTERACTIVE, clock.now)  # 0.8 tokens
+    clock.now = 0.5
+    assert limiter.acquire(INTERACTIVE, clock.now)
+
+
+def test_background_leaves_the_reserve_for_interactive(clock):
+    limiter = PriorityRateLimiter(rate=1, burst=5, reserve=2)
+    assert all(limiter.acquire(BACKGROUND, 0) for _ in range(3))
+    assert not limiter.acquire(BACKGROUND, 0)
+    assert limiter.acquire(INTERACTIVE, 0) and limiter.acquire(INTERACTIVE, 0)
+    assert not limiter.acquire(INTERACTIVE, 0)
+
+
+def test_interactive_is_served_before_earlier_background(clock):
+    limiter = PriorityRateLimiter(rate=1, burst=1)
+    assert limiter.acquire(INTERACTIVE, 0)
+    order = []
+    background, _ = start_waiter(limiter, BACKGROUND, order)
+    wait_until(lambda: limiter.stats()["queued"] == 1)
+    interactive, _ = start_waiter(limiter, INTERACTIVE, order)
+    wait_until(lambda: limiter.stats()["queued"] == 2)
+
+    advance(clock, limiter, 1)
+    interactive.join(5)
+    assert order == [INTERACTIVE]
+    assert limiter.stats()["queued"] == 1
+
+    advance(clock, limiter, 1)
+    background.join(5)
+    assert order == [INTERACTIVE, BACKGROUND]
+
+
+def test_same_priority_is_first_come_first_served(clock):
+    limiter = PriorityRateLimiter(rate=1, burst=1)
+    assert limiter.acquire(INTERACTIVE, 0)
+    order = []
+    first, _ = start_waiter(limiter, INTERACTIVE, order, label="first")
+    wait_until(lambda: limiter.stats()["queued"] == 1)
+    second, _ = start_waiter(limiter, INTERACTIVE, order, label="second")
+    wait_until(lambda: limiter.stats()["queued"] == 2)
+
+    advance(clock, limiter, 1)
+    first.join(5)
+    second.join(0.05)
+    assert order == ["first"]
+    advance(clock, limiter, 1)
+    second.join(5)
+    assert order == ["first", "second"]
+
+
+def test_expired_waiter_does_not_block_the_queue(clock):
+    limiter = PriorityRateLimiter(rate=1, burst=1)
+    assert limiter.acquire(INTERACTIVE, 0)
+    order = []
+    expiring, expiring_result = start_waiter(limiter, INTERACTIVE, order, deadline=0.5)
+    wait_until(lambda: limiter.stats()["queued"] == 1)
+    waiting, waiting_result = start_waiter(limiter, BACKGROUND, order, deadline=10)
+    wait_until(lambda: limiter.stats()["queued"] == 2)
+
+    advance(clock, limiter, 0.6)
+    expiring.join(5)
+    assert expiring_result == [False]
+    assert limiter.stats()["expired"]["interactive"] == 1
+
+    advance(clock, limiter, 0.6)
+    waiting.join(5)
+    assert waiting_result == [True]
+    assert limiter.stats()["queued"] == 0
+
+
+def test_pause_blocks_until_it_ends(clock):
+    limiter = PriorityRateLimiter(rate=1, burst=2)
+    limiter.pause(3)
+    assert limiter.stats()["paused_for"] == 3
+    assert not limiter.acquire(INTERACTIVE, clock.now)
+    clock.now = 2.9
+    assert not limiter.acquire(INTERACTIVE, clock.now)  # tokens refilled, but still paused
+    clock.now = 3.0
+    assert limiter.acquire(INTERACTIVE, clock.now)
+    assert limiter.stats()["pauses"] == 1
+
+
+def test_pause_drains_the_burst(clock):
+    limiter = PriorityRateLimiter(rate=1, burst=10)
+    limiter.pause(1)
+    clock.now = 1.0
+    assert limiter.acquire(INTERACTIVE, clock.now)
+    assert not limiter.acquire(INTERACTIVE, clock.now)  # resumes at the refill rate, not with a burst
+
+
+def test_shorter_pause_does_not_cut_a_longer_one(clock):
+    limiter = PriorityRateLimiter(rate=1, burst=1)
+    limiter.pause(5)
+    limiter.pause(1)
+    clock.now = 2.0
+    assert not limiter.acquire(INTERACTIVE, clock.now)
+    assert limiter.stats()["pauses"] == 1
+
+
+def test_pause_wakes_and_delays_a_waiter(clock):
+    limiter = PriorityRateLimiter(rate=1, burst=1)
+    assert limiter.acquire(INTERACTIVE, 0)
+    order = []
+    waiter, result = start_waiter(limiter, INTERACTIVE, order, deadline=10)
+    wait_until(lambda: limiter.stats()["queued"] == 1)
+    limiter.pause(4)
+    advance(clock, limiter, 2)
+    waiter.join(0.05)
+    assert waiter.is_alive()
+    advance(clock, limiter, 3)
+    waiter.join(5)
+    assert result == [True]
+
+
+def test_zero_rate_disables_the_limiter(clock):
+    limiter = PriorityRateLimiter(rate=0, burst=1)
+    assert all(limiter.acquire(BACKGROUND, 0) for _ in range(100))
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("5", 5.0),
+    ("0.5", 0.5),
+    ("-3", 0.0),
+    ("", None),
+    (None, None),
+    ("soon", None),
+])
+def test_retry_after_seconds(value, expected):
+    assert retry_after_seconds(value) == expected
+
+
+def test_retry_after_http_date():
+    now = datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    later = datetime(2024, 1, 1, 12, 0, 30, tzinfo=timezone.utc)
+    assert retry_after_seconds(format_datetime(later, usegmt=True), now=now.timestamp()) == 30.0
+    assert retry_after_seconds(format_datetime(now, usegmt=True), now=later.timestamp()) == 0.0
+
+
+def test_shared_bucket_is_one_quota_across_limiters(clock, tmp_path):
+    path = str(tmp_path / "rate.sqlite3")
+    first = PriorityRateLimiter(rate=1, burst=2, shared_path=path)
+    second = PriorityRateLimiter(rate=1, burst=2, shared_path=path)
+    assert first.shared and second.shared
+    assert first.acquire(INTERACTIVE, 0) and second.acquire(INTERACTIVE, 0)
+    assert not first.acquire(INTERACTIVE, 0) and not second.acquire(INTERACTIVE, 0)
+    clock.now = 1.0
+    assert second.acquire(INTERACTIVE, clock.now)
+    assert not first.acquire(INTERACTIVE, clock.now)
+
+
+def test_shared_bucket_keeps_the_reserve_for_other_processes(clock, tmp_path):
+    path = str(tmp_path / "rate.sqlite3")
+    warmer = PriorityRateLimiter(rate=1, burst=4, reserve=2, shared_path=path)
+    server = PriorityRateLimiter(rate=1, burst=4, reserve=2, shared_path=path)
+    assert warmer.acquire(BACKGROUND, 0) and warmer.acquire(BACKGROUND, 0)
+    assert not warmer.acquire(BACKGROUND, 0)
+    assert server.acquire(INTERACTIVE, 0) and server.acquire(INTERACTIVE, 0)
+
+
+def test_shared_pause_applies_to_every_limiter(clock, tmp_path):
+    path = str(tmp_path / "rate.sqlite3")
+    first = PriorityRateLimiter(rate=1, burst=2, shared_path=path)
+    second = PriorityRateLimiter(rate=1, burst=2, shared_path=path)
+    first.pause(3)
+    assert second.stats()["paused_for"] == 3
+    clock.now = 2.0
+    assert not second.acquire(INTERACTIVE, clock.now)
+    clock.now = 3.0
+    assert second.acquire(INTERACTIVE, clock.now)
+
+
+def test_unusable_shared_state_falls_back_to_the_process_share(clock, tmp_path):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    limiter = PriorityRateLimiter(rate=40, burst=1, shared_path=str(blocker / "rate.sqlite3"), fallback_rate=10)
+    assert limiter.acquire(INTERACTIVE, 0)
+    assert not limiter.shared
+    assert limiter.rate == 10
+    assert not limiter.acquire(INTERACTIVE, 0)
+    clock.now = 0.1
+    assert limiter.acquire(INTERACTIVE, clock.now)
+
+
+def test_without_shared_state_the_process_share_applies(clock):
+    limiter = PriorityRateLimiter(rate=40, burst=1, shared_path="", fallback_rate=10)
+    assert not limiter.shared
+    assert limiter.rate == 10
+    assert PriorityRateLimiter(rate=40, burst=1).rate == 40
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from scipy import sparse
+from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
+from reranker import Reranker
+
+
+@pytest.fixture(scope="module")
+def reranker():
+    rng = np.random.default_rng(3)
+    vectors = sparse.random(30, 60, density=0.1, random_state=rng, format="csr", dtype=np.float32)
+    vectors = normalize(vectors + sparse.eye(30, 60, dtype=np.float32, format="csr") * 0.1).astype(np.float32).tocsr()
+    genres = normalize((rng.random((30, 6)) < 0.4).astype(np.float32) + np.eye(30, 6, dtype=np.float32))
+    return Reranker(vectors, rng.random(30).astype(np.float32), rng.random(30).astype(np.float32), genres)
+
+
+WEIGHTS = {"similarity": 1.0, "genre": 0.5, "quality": 0.3, "recency": 0.2}
+SEED = 0
+CANDIDATES = np.arange(1, 30)
+
+
+def similarity_to_seed(reranker):
+    return cosine_similarity(reranker.vectors[CANDIDATES], reranker.vectors[SEED]).ravel()
+
+
+def brute_force_mmr(reranker, relevance, k, diversity):
+    """Greedy maximal marginal relevance over a full pairwise redundancy matrix"""
+    content = cosine_similarity(reranker.vectors[CANDIDATES])
+    genres = cosine_similarity(reranker.genres[CANDIDATES])
+    redundancy = (content + genres) / 2
+    picks = []
+    for _ in range(k):
+        closest = redundancy[:, picks].max(axis=1) if picks else np.zeros(len(CANDIDATES))
+        marginal = (1 - diversity) * relevance - diversity * closest
+        marginal[picks] = -np.inf
+        picks.append(int(np.argmax(marginal)))
+    return CANDIDATES[picks]
+
+
+def test_dense_rows_match_the_sparse_rows_on_used_columns(reranker):
+    candidates = np.array([5, 2, 17, 29])
+    rows = reranker.vectors[candidates].toarray()
+    used = np.flatnonzero(np.abs(rows).sum(axis=0))
+    assert np.allclose(reranker.dense_rows(candidates), rows[:, used])
+
+
+def test_no_diversity_keeps_the_relevance_order(reranker):
+    similarity = similarity_to_seed(reranker)
+    positions, relevance = reranker.rerank(SEED, CANDIDATES, similarity, 10, WEIGHTS, diversity=0)
+    expected = (
+        similarity / similarity.max()
+        + 0.5 * reranker.genres[CANDIDATES] @ reranker.genres[SEED]
+        + 0.3 * reranker.quality[CANDIDATES]
+        + 0.2 * reranker.recency[CANDIDATES]
+    )
+    order = np.argsort(-expected, kind="stable")[:10]
+    assert np.array_equal(positions, CANDIDATES[order])
+    assert np.allclose(relevance, expected[order], atol=1e-5)
+
+
+def test_similarity_only_ranks_like_cosine(reranker):
+    similarity = similarity_to_seed(reranker)
+    positions, _ = reranker.rerank(SEED, CANDIDATES, similarity, 8, {"similarity": 1.0})
+    assert np.array_equal(positions, CANDIDATES[np.argsort(-similarity, kind="stable")[:8]])
+
+
+@pytest.mark.parametrize("diversity", [0.3, 0.7])
+def test_mmr_matches_a_brute_force_greedy_pick(reranker, diversity):
+    similarity = similarity_to_seed(reranker)
+    relevance = reranker.relevance(SEED, CANDIDATES, similarity, WEIGHTS)
+    positions, _ = reranker.rerank(SEED, CANDIDATES, similarity, 10, WEIGHTS, diversity=diversity)
+    assert positions[0] == CANDIDATES[np.argmax(relevance)]
+    assert np.array_equal(positions, brute_force_mmr(reranker, relevance, 10, diversity))
+    assert len(set(positions.tolist())) == 10
@@ -0,0 +1,128 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from singleflight import SingleFlight
+
+
+def claim_signal(flight):
+    """Make the flight report each claim, so followers can be awaited deterministically"""
+    claimed = threading.Semaphore(0)
+    claim = flight._claim
+
+    def signalling_claim(key):
+        result = claim(key)
+        claimed.release()
+        return result
+
+    flight._claim = signalling_claim
+    return claimed
+
+
+def test_do_coalesces_concurrent_callers():
+    flight = SingleFlight()
+    claimed = claim_signal(flight)
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {"id": 1}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("movie/1", fetch))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for _ in threads:
+        assert claimed.acquire(timeout=5)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert len(results) == 4
+    assert all(result is results[0] for result in results)
+    assert flight.in_flight() == 0
+
+
+def test_exception_reaches_every_caller_and_key_is_released():
+    flight = SingleFlight()
+    claimed = claim_signal(flight)
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise ValueError("upstream failed")
+
+    errors = []
+
+    def call():
+        try:
+            flight.do("movie/1", fail)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for _ in threads:
+        assert claimed.acquire(timeout=5)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(errors) == 3
+    assert flight.in_flight() == 0
+    assert flight.do("movie/1", lambda: "retried") == "retried"
+
+
+def test_completed_calls_are_not_cached():
+    flight = SingleFlight()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return len(calls)
+
+    assert flight.do("key", fetch) == 1
+    assert flight.do("key", fetch) == 2
+
+
+def test_submit_shares_the_in_flight_future():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def refresh():
+        calls.append(1)
+        release.wait(5)
+        return "fresh"
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = flight.submit("key", executor, refresh)
+        second = flight.submit("key", executor, refresh)
+        other = flight.submit("other", executor, lambda: "other")
+        assert second is first
+        assert other is not first
+        release.set()
+        assert first.result(5) == "fresh"
+        assert other.result(5) == "other"
+    assert len(calls) == 1
+    assert flight.in_flight() == 0
+
+
+def test_follower_of_submit_waits_for_the_leader():
+    flight = SingleFlight()
+    claimed = claim_signal(flight)
+    release = threading.Event()
+    results = []
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = flight.submit("key", executor, lambda: release.wait(5) and "done")
+        assert claimed.acquire(timeout=5)
+        follower = threading.Thread(target=lambda: results.append(flight.do("key", pytest.fail)))
+        follower.start()
+        assert claimed.acquire(timeout=5)
+        release.set()
+        follower.join(5)
+        assert future.result(5) == "done"
+    assert results == ["done"]
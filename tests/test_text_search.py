@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+from neighbors import build_postings
+from pipeline import build_vectors
+from text_search import TextSearch
+
+CORPUS = [
+    "A detective hunts a killer through a rainy city at night",
+    "Space pilots fight an alien empire across the galaxy",
+    "A robot learns to love on an abandoned space station",
+    "Two friends plan a heist at a casino in Las Vegas",
+    "A young wizard attends a school of magic and fights a dark lord",
+    "A detective and a robot partner solve murders in a future city",
+    "A family road trip turns into a comedy of errors",
+    "Pirates search for treasure on a cursed island",
+    "A heist crew steals from a space station bank",
+    "A lonely robot cleans up an abandoned earth and finds love",
+    "A magic school for young witches faces a dragon",
+    "Soldiers survive a brutal war on a remote island",
+]
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    tfidf, vectors = build_vectors(pd.DataFrame({"tags": CORPUS}))
+    search = TextSearch(tfidf.vocabulary_, tfidf.idf_, build_postings(vectors))
+    return tfidf, vectors, search
+
+
+def exact_scores(tfidf, vectors, text):
+    return (vectors @ tfidf.transform([text]).T).toarray().ravel()
+
+
+def test_vectorize_matches_tfidf_transform(fitted):
+    tfidf, _, search = fitted
+    text = "Robot detective in a space city, robot partner"
+    terms, columns, weights = search.vectorize(text)
+    expected = tfidf.transform([text]).toarray().ravel()
+    assert set(columns) == set(np.flatnonzero(expected))
+    np.testing.assert_allclose(weights, expected[columns], rtol=1e-5)
+    assert np.all(np.diff(weights) <= 0)  # strongest first
+    assert [tfidf.vocabulary_[t] for t in terms] == list(columns)
+
+
+@pytest.mark.parametrize("text", [
+    "robot love",
+    "heist in space",
+    "a detective story in the city",
+    "magic school dragon",
+    "island",
+])
+def test_search_matches_exact_scan(fitted, text):
+    tfidf, vectors, search = fitted
+    expected = exact_scores(tfidf, vectors, text)
+    k = 4
+    positions, scores, terms = search.search(text, k)
+    assert terms
+    n_matching = int(np.count_nonzero(expected))
+    assert len(positions) == min(k, n_matching)
+    np.testing.assert_allclose(scores, expected[positions], rtol=1e-5)
+    np.testing.assert_allclose(scores, np.sort(expected)[::-1][:len(positions)], rtol=1e-5)
+
+
+def test_search_respects_mask(fitted):
+    tfidf, vectors, search = fitted
+    mask = np.zeros(len(CORPUS), dtype=bool)
+    mask[[2, 8]] = True
+    positions, scores, _ = search.search("robot space station", 5, mask)
+    assert set(positions) <= {2, 8}
+    np.testing.assert_allclose(scores, exact_scores(tfidf, vectors, "robot space station")[positions], rtol=1e-5)
+
+
+def test_search_without_known_terms(fitted):
+    _, _, search = fitted
+    positions, scores, terms = search.search("the and of", 5)  # stop words only
+    assert terms == [] and len(positions) == 0 and len(scores) == 0
@@ -0,0 +1,70 @@
+import pytest
+from title_index import TitleIndex, normalize_title
+
+TITLES = ["The Dark Knight", "The Dark Knight Rises", "Knight and Day", "Amélie", "Avatar", "Up", "1917", "Avatar"]
+IDS = [155, 49026, 37834, 194, 19995, 14160, 530915, 99999]
+VOTES = [12000, 9000, 1500, 2000, 11800, 7000, 3000, 10]
+
+
+@pytest.fixture
+def index():
+    return TitleIndex(TITLES, IDS, VOTES)
+
+
+def test_normalize_title():
+    assert normalize_title("  Amélie!  ") == "amelie"
+    assert normalize_title("Spider-Man: No Way Home") == "spider man no way home"
+    assert normalize_title(None) == ""
+
+
+@pytest.mark.parametrize("query, position", [
+    ("The Dark Knight", 0),
+    ("THE DARK KNIGHT!", 0),
+    ("the dark knight rises", 1),
+    ("Amelie", 3),
+    ("1917", 6),
+])
+def test_resolve_exact(index, query, position):
+    assert index.resolve(query) == position
+    assert index.resolve(query, fuzzy=False) == position
+
+
+def test_resolve_duplicate_title_prefers_most_voted(index):
+    assert index.resolve("Avatar") == 4
+
+
+def test_resolve_fuzzy(index):
+    assert index.resolve("The Dark Knigt") == 0
+    assert index.resolve("The Dark Knigt", fuzzy=False) is None
+
+
+@pytest.mark.parametrize("query", ["", "   ", "zzzz", "Avatr"])
+def test_resolve_no_match(index, query):
+    assert index.resolve(query) is None
+
+
+def test_resolve_id(index):
+    assert index.resolve_id(155) == 0
+    assert index.resolve_id("155") == 0
+    assert index.resolve_id(1) is None
+    assert index.resolve_id("x") is None
+    assert index.resolve_id(None) is None
+
+
+def test_suggest_ranks_full_title_prefixes_before_word_prefixes(index):
+    assert [TITLES[p] for p in index.suggest("knight")] == ["Knight and Day", "The Dark Knight", "The Dark Knight Rises"]
+
+
+def test_suggest_orders_prefix_matches_by_votes(index):
+    assert index.suggest("the dark") == [0, 1]
+    assert index.suggest("av") == [4, 7]
+
+
+def test_suggest_falls_back_to_fuzzy(index):
+    assert index.suggest("dark knigt") == [0, 1]
+
+
+def test_suggest_limit_and_empty(index):
+    assert index.suggest("knight", limit=1) == [2]
+    assert index.suggest("") == []
+    assert index.suggest("zz") == []